@@ -13,20 +13,53 @@ except ImportError as e:
     BLOB_AVAILABLE = False
     vercel_blob = None
 
+# Prefer orjson for JSON encoding, fall back to the stdlib when unavailable
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+def json_dumps_bytes(data) -> bytes:
+    """Serialize data to UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+def json_loads(raw: bytes):
+    """Parse a UTF-8 JSON request body without decoding it to str first"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+# The request body is a tiny {sessionId} object; anything larger is rejected
+# before it is read into memory
+MAX_BODY_BYTES = 8 * 1024
+
 class handler(BaseHTTPRequestHandler):
+    # Buffer wfile so the header block and a small body leave in one send;
+    # StreamRequestHandler.finish() flushes it after each request
+    wbufsize = -1
+    
     def do_OPTIONS(self):
-        self.send_response(200)
+        # Let browsers cache the preflight for a day instead of repeating it per call
+        self.send_response(204)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Max-Age', '86400')
         self.end_headers()
 
     def do_POST(self):
         try:
             # Parse request body
             content_length = int(self.headers['Content-Length'])
+            if content_length > MAX_BODY_BYTES:
+                self.send_error_response(413, 'Request body too large')
+                return
             post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = json_loads(post_data)
             
             session_id = data.get('sessionId')
             
@@ -171,7 +204,7 @@ class handler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(json_dumps_bytes(data))
     
     def send_error_response(self, status_code: int, message: str):
         response = {
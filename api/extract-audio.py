@@ -20,11 +20,51 @@ except ImportError as e:
     BLOB_AVAILABLE = False
     vercel_blob = None
 
+# Prefer orjson for JSON encoding, fall back to the stdlib when unavailable
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+def json_dumps_bytes(data) -> bytes:
+    """Serialize data to UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+def json_loads(raw: bytes):
+    """Parse a UTF-8 JSON request body without decoding it to str first"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
 # YouTube URL validation regex
 YOUTUBE_URL_REGEX = re.compile(
     r'^(https?://)?(www\.)?(youtube\.com/(watch\?v=|embed/|v/)|youtu\.be/)([a-zA-Z0-9_-]{11})(\S*)?$'
 )
 
+READ_CHUNK_SIZE = 64 * 1024
+
+def read_file_hashed(path):
+    """Read a file into one preallocated buffer, hashing each chunk while it is
+    still in cache; returns (content, 12-char SHA-256 prefix)"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        content = bytearray(os.fstat(f.fileno()).st_size)
+        view = memoryview(content)
+        received = 0
+        while received < len(content):
+            count = f.readinto(view[received:received + READ_CHUNK_SIZE])
+            if not count:
+                break
+            hasher.update(view[received:received + count])
+            received += count
+        view.release()
+    del content[received:]
+    return content, hasher.hexdigest()[:12]
+
 def validate_youtube_url(url: str) -> bool:
     """Validate YouTube URL format"""
     return bool(YOUTUBE_URL_REGEX.match(url.strip()))
@@ -199,12 +239,12 @@ def download_youtube_audio(url: str, output_path: str, cookies_content: str = No
     last_error = None
     video_info = None
     
-    for strategy_name, ydl_opts in strategies:
+    for attempt, (strategy_name, ydl_opts) in enumerate(strategies):
         try:
             print(f"Trying download strategy: {strategy_name}")
             
-            # Add delay between strategies
-            if strategy_name != "minimal_fallback":
+            # Add delay between strategies (not before the first attempt)
+            if attempt:
                 time.sleep(random.uniform(1, 2))
                 
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
@@ -300,11 +340,17 @@ def download_youtube_audio(url: str, output_path: str, cookies_content: str = No
         raise Exception("Failed to download audio using all available methods.")
 
 class handler(BaseHTTPRequestHandler):
+    # Buffer wfile so the header block and a small body leave in one send;
+    # StreamRequestHandler.finish() flushes it after each request
+    wbufsize = -1
+    
     def do_OPTIONS(self):
-        self.send_response(200)
+        # Let browsers cache the preflight for a day instead of repeating it per call
+        self.send_response(204)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Max-Age', '86400')
         self.end_headers()
 
     def do_POST(self):
@@ -312,7 +358,7 @@ class handler(BaseHTTPRequestHandler):
             # Parse request body
             content_length = int(self.headers['Content-Length'])
             post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = json_loads(post_data)
             
             youtube_url = data.get('youtubeUrl')
             cookies_content = data.get('youtubeCookies')
@@ -333,21 +379,14 @@ class handler(BaseHTTPRequestHandler):
             
             # Download audio using yt-dlp
             try:
-                # Create temp file for download
-                with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_file:
-                    temp_audio_path = temp_file.name
-                
-                video_info = download_youtube_audio(youtube_url, temp_audio_path, cookies_content)
-                
-                # Read the downloaded file
-                with open(temp_audio_path, 'rb') as f:
-                    audio_data = f.read()
-                
-                # Clean up temp file
-                try:
-                    os.unlink(temp_audio_path)
-                except:
-                    pass
+                # Download into a per-request directory; it is removed (with any
+                # partial files yt-dlp leaves behind) even when the download fails
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    temp_audio_path = os.path.join(temp_dir, 'audio.mp3')
+                    video_info = download_youtube_audio(youtube_url, temp_audio_path, cookies_content)
+                    
+                    # Read the downloaded file
+                    audio_data, content_hash = read_file_hashed(temp_audio_path)
                 
                 audio_size_mb = len(audio_data) / (1024 * 1024)
                 duration_minutes = video_info['duration'] / 60
@@ -365,9 +404,10 @@ class handler(BaseHTTPRequestHandler):
                 
             except Exception as e:
                 error_msg = str(e)
+                error_lower = error_msg.lower()
                 
                 # Check for specific YouTube errors
-                if any(phrase in error_msg.lower() for phrase in ['sign in', 'bot', 'captcha', 'json', 'player response']):
+                if any(phrase in error_lower for phrase in ['sign in', 'bot', 'captcha', 'json', 'player response']):
                     self.send_error_response(429, 
                         'YouTube is blocking automated requests from this server (common with cloud functions). '
                         'Solutions: 1) Try a different YouTube video (popular music videos work better), '
@@ -375,11 +415,11 @@ class handler(BaseHTTPRequestHandler):
                         '4) Consider uploading an audio file directly instead. '
                         'This is a YouTube limitation, not an app issue.')
                     return
-                elif 'Private video' in error_msg or 'unavailable' in error_msg.lower():
+                elif 'Private video' in error_msg or 'unavailable' in error_lower:
                     self.send_error_response(400, 
                         'This video is private, unavailable, or restricted. Please use a public video.')
                     return
-                elif 'age-restricted' in error_msg.lower():
+                elif 'age-restricted' in error_lower:
                     self.send_error_response(400, 
                         'This video is age-restricted and cannot be processed. Please use a different video.')
                     return
@@ -405,7 +445,7 @@ class handler(BaseHTTPRequestHandler):
                 # Upload to blob storage (ONLY method)
                 try:
                     print(f"Uploading {audio_size_mb:.2f}MB YouTube audio to blob storage")
-                    blob_url = self._upload_to_blob_storage(audio_data, video_info['title'], session_id)
+                    blob_url = self._upload_to_blob_storage(audio_data, video_info['title'], session_id, content_hash)
                     response = {
                         'audioUrl': blob_url,
                         'duration': video_info['duration'],
@@ -435,7 +475,7 @@ class handler(BaseHTTPRequestHandler):
         except Exception as e:
             self.send_error_response(500, f'An unexpected error occurred: {str(e)}')
     
-    def _upload_to_blob_storage(self, audio_content: bytes, title: str, session_id: str) -> str:
+    def _upload_to_blob_storage(self, audio_content: bytes, title: str, session_id: str, content_hash: str = None) -> str:
         """Upload audio content to Vercel Blob storage with session-based folder structure"""
         
         if not BLOB_AVAILABLE:
@@ -456,7 +496,8 @@ class handler(BaseHTTPRequestHandler):
                 raise Exception("BLOB_READ_WRITE_TOKEN environment variable is required")
             
             # Create a unique filename with session-based folder structure
-            content_hash = hashlib.sha256(audio_content).hexdigest()[:12]
+            if content_hash is None:
+                content_hash = hashlib.sha256(audio_content).hexdigest()[:12]
             timestamp = int(time.time())
             # Sanitize title for filename
             safe_title = re.sub(r'[^\w\-_\.]', '_', title)[:50]
@@ -504,7 +545,7 @@ class handler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(json_dumps_bytes(data))
     
     def send_error_response(self, status_code: int, message: str):
         response = {
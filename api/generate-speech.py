@@ -5,7 +5,8 @@ import requests
 import time
 import os
 import hashlib
-from typing import Dict, Any
+from cachetools import TTLCache
+from typing import Dict, Any, Optional
 
 # Try to import vercel_blob, but handle gracefully if not available
 try:
@@ -17,6 +18,55 @@ except ImportError as e:
     BLOB_AVAILABLE = False
     vercel_blob = None
 
+# Prefer orjson for JSON encoding, fall back to the stdlib when unavailable
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+def json_dumps_bytes(data) -> bytes:
+    """Serialize data to UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+def json_loads(raw: bytes):
+    """Parse a UTF-8 JSON request body without decoding it to str first"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+# Request-level diagnostics (settings, blob module and result dumps) are only
+# printed when SPEECH_DEBUG is set
+SPEECH_DEBUG = bool(os.environ.get('SPEECH_DEBUG'))
+
+# Headers sent with every JSON response
+JSON_RESPONSE_HEADERS = (
+    ('Content-Type', 'application/json'),
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+)
+
+# Shared session so warm invocations reuse pooled ElevenLabs connections
+_SESSION = requests.Session()
+
+# Short-lived cache of rejected (api key hash, voice id) pairs so retries with
+# a bad key or voice fail fast instead of hitting ElevenLabs again. Only
+# rejections of the key (401) or the voice itself (422 naming voice_id) are
+# cached; other 422s depend on the request body. TTLCache caps memory on
+# long-lived warm containers.
+NEGATIVE_CACHE_TTL = 30  # seconds
+NEGATIVE_CACHE_MAX_ENTRIES = 4096
+_NEG_CACHE = TTLCache(maxsize=NEGATIVE_CACHE_MAX_ENTRIES, ttl=NEGATIVE_CACHE_TTL)
+
+def negative_cache_key(api_key: str, voice_id: str) -> tuple:
+    """Build a cache key that never stores the raw API key"""
+    key_hash = hashlib.blake2b(api_key.encode('utf-8'), digest_size=8).hexdigest()
+    return (key_hash, voice_id)
+
 # ElevenLabs model configurations
 ELEVENLABS_MODELS = {
     'eleven_multilingual_v2': {'limit': 10000, 'quality': 'high'},
@@ -61,23 +111,62 @@ def get_model_specific_settings(model_id: str, base_settings: dict) -> dict:
     
     return settings
 
+# Required string fields: (key, message when missing, message when blank)
+REQUIRED_STRING_FIELDS = (
+    ('apiKey', 'Missing required field: apiKey', 'API key must be a non-empty string'),
+    ('text', 'Missing required field: text', 'Text must be a non-empty string'),
+    ('voiceId', 'Missing required field: voiceId', 'Voice ID must be a non-empty string'),
+)
+
+def validate_request(data) -> Optional[str]:
+    """Validate a generate-speech request body, returning an error message or None"""
+    if not isinstance(data, dict):
+        return 'Request body must be a JSON object'
+    
+    for key, missing_message, blank_message in REQUIRED_STRING_FIELDS:
+        value = data.get(key)
+        if not value:
+            return missing_message
+        if not isinstance(value, str) or not value.strip():
+            return blank_message
+    
+    if not data.get('sessionId'):
+        return 'Session ID is required'
+    
+    if data.get('modelId', 'eleven_multilingual_v2') not in ELEVENLABS_MODELS:
+        available_models = ', '.join(ELEVENLABS_MODELS.keys())
+        return f'Invalid model_id. Available models: {available_models}'
+    
+    if not isinstance(data.get('settings', {}), dict):
+        return 'Settings must be a JSON object'
+    
+    return None
+
 class handler(BaseHTTPRequestHandler):
+    # Buffer wfile so the header block and a small body leave in one send;
+    # StreamRequestHandler.finish() flushes it after each request
+    wbufsize = -1
+    
     def do_OPTIONS(self):
-        self.send_response(200)
+        # Let browsers cache the preflight for a day instead of repeating it per call
+        self.send_response(204)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Max-Age', '86400')
         self.end_headers()
 
     def do_POST(self):
         try:
-            # Validate Content-Length header
-            if 'Content-Length' not in self.headers:
+            # Validate Content-Length header (looked up once; HTTPMessage
+            # lookups scan every header)
+            content_length_header = self.headers.get('Content-Length')
+            if content_length_header is None:
                 self.send_error_response(400, 'Missing Content-Length header')
                 return
             
             try:
-                content_length = int(self.headers['Content-Length'])
+                content_length = int(content_length_header)
             except ValueError:
                 self.send_error_response(400, 'Invalid Content-Length header')
                 return
@@ -88,12 +177,10 @@ class handler(BaseHTTPRequestHandler):
             
             # Parse request body with timeout protection
             try:
+                # A short read only happens when the client disconnects; the
+                # truncated body then fails JSON parsing below with a 400
                 post_data = self.rfile.read(content_length)
-                if len(post_data) != content_length:
-                    self.send_error_response(400, 'Incomplete request body received')
-                    return
-                
-                data = json.loads(post_data.decode('utf-8'))
+                data = json_loads(post_data)
             except json.JSONDecodeError as e:
                 self.send_error_response(400, f'Invalid JSON in request body: {str(e)}')
                 return
@@ -101,50 +188,25 @@ class handler(BaseHTTPRequestHandler):
                 self.send_error_response(400, 'Invalid UTF-8 encoding in request body')
                 return
             
-            # Validate required fields with specific error messages
-            api_key = data.get('apiKey')
-            text = data.get('text')
-            voice_id = data.get('voiceId')
+            # Validate all fields in one pass
+            validation_error = validate_request(data)
+            if validation_error:
+                self.send_error_response(400, validation_error)
+                return
+            
+            api_key = data['apiKey']
+            text = data['text']
+            voice_id = data['voiceId']
             settings = data.get('settings', {})
             model_id = data.get('modelId', 'eleven_multilingual_v2')
             output_format = data.get('outputFormat', 'mp3_44100_128')
-            session_id = data.get('sessionId')
-            
-            # Detailed validation with specific error messages
-            if not api_key:
-                self.send_error_response(400, 'Missing required field: apiKey')
-                return
-            if not isinstance(api_key, str) or len(api_key.strip()) == 0:
-                self.send_error_response(400, 'API key must be a non-empty string')
-                return
-            
-            if not text:
-                self.send_error_response(400, 'Missing required field: text')
-                return
-            if not isinstance(text, str) or len(text.strip()) == 0:
-                self.send_error_response(400, 'Text must be a non-empty string')
-                return
-            
-            if not voice_id:
-                self.send_error_response(400, 'Missing required field: voiceId')
-                return
-            if not isinstance(voice_id, str) or len(voice_id.strip()) == 0:
-                self.send_error_response(400, 'Voice ID must be a non-empty string')
-                return
+            session_id = data['sessionId']
             
-            if not session_id:
-                self.send_error_response(400, 'Session ID is required')
-                return
-            
-            # Validate model_id
-            if model_id not in ELEVENLABS_MODELS:
-                available_models = ', '.join(ELEVENLABS_MODELS.keys())
-                self.send_error_response(400, f'Invalid model_id. Available models: {available_models}')
-                return
-            
-            # Validate settings structure
-            if not isinstance(settings, dict):
-                self.send_error_response(400, 'Settings must be a JSON object')
+            # Fail fast on a key/voice pair ElevenLabs rejected moments ago
+            rejection_key = negative_cache_key(api_key, voice_id)
+            cached_rejection = _NEG_CACHE.get(rejection_key)
+            if cached_rejection:
+                self.send_error_response(*cached_rejection)
                 return
             
             # Log text length for monitoring (no limits since we use blob storage)
@@ -159,7 +221,8 @@ class handler(BaseHTTPRequestHandler):
             
             # Log the final settings for debugging
             print(f"Using model: {model_id}")
-            print(f"Final TTS settings: {tts_settings}")
+            if SPEECH_DEBUG:
+                print(f"Final TTS settings: {tts_settings}")
             
             # Make request to ElevenLabs
             headers = {
@@ -168,12 +231,13 @@ class handler(BaseHTTPRequestHandler):
                 'xi-api-key': api_key
             }
             
-            payload = {
+            # Serialize once up front; retries resend the same bytes
+            body_bytes = json_dumps_bytes({
                 'text': text,
                 'model_id': model_id,
                 'voice_settings': tts_settings,
                 'output_format': output_format
-            }
+            })
             
             try:
                 # Make request with retry logic for transient failures
@@ -182,10 +246,10 @@ class handler(BaseHTTPRequestHandler):
                 
                 for attempt in range(max_retries + 1):
                     try:
-                        response = requests.post(
+                        response = _SESSION.post(
                             f'https://api.elevenlabs.io/v1/text-to-speech/{voice_id}',
                             headers=headers,
-                            json=payload,
+                            data=body_bytes,
                             timeout=90  # Generous timeout for blob storage processing
                         )
                         break  # Success, exit retry loop
@@ -209,6 +273,8 @@ class handler(BaseHTTPRequestHandler):
                 # Enhanced error handling for ElevenLabs API responses
                 if not response.ok:
                     error_details = self._parse_elevenlabs_error(response)
+                    if response.status_code == 401 or error_details.get('invalid_voice'):
+                        _NEG_CACHE[rejection_key] = (response.status_code, error_details['message'])
                     self.send_error_response(response.status_code, error_details['message'])
                     return
                 
@@ -221,8 +287,9 @@ class handler(BaseHTTPRequestHandler):
                 print(f"Generated audio file: {audio_size_mb:.2f}MB")
                 
                 # BLOB STORAGE ONLY - No fallback logic
-                print(f"BLOB_AVAILABLE: {BLOB_AVAILABLE}")
-                print(f"vercel_blob module: {vercel_blob}")
+                if SPEECH_DEBUG:
+                    print(f"BLOB_AVAILABLE: {BLOB_AVAILABLE}")
+                    print(f"vercel_blob module: {vercel_blob}")
                 print(f"Uploading {audio_size_mb:.2f}MB audio file to blob storage")
                 
                 # Check if blob storage is available
@@ -276,9 +343,10 @@ class handler(BaseHTTPRequestHandler):
     def _upload_to_blob_storage(self, audio_content: bytes, voice_id: str, text: str, session_id: str) -> str:
         """Upload audio content to Vercel Blob storage with session-based folder structure"""
         
-        print(f"🔍 _upload_to_blob_storage called for session: {session_id}")
-        print(f"🔍 BLOB_AVAILABLE: {BLOB_AVAILABLE}")
-        print(f"🔍 vercel_blob: {vercel_blob}")
+        if SPEECH_DEBUG:
+            print(f"🔍 _upload_to_blob_storage called for session: {session_id}")
+            print(f"🔍 BLOB_AVAILABLE: {BLOB_AVAILABLE}")
+            print(f"🔍 vercel_blob: {vercel_blob}")
         
         if not BLOB_AVAILABLE:
             raise Exception("vercel_blob package not available")
@@ -291,7 +359,8 @@ class handler(BaseHTTPRequestHandler):
                 print("Please set this in your Vercel project environment variables")
                 raise Exception("BLOB_READ_WRITE_TOKEN environment variable is required")
             
-            print(f"✅ Found blob token: {blob_token[:10]}...")
+            if SPEECH_DEBUG:
+                print(f"✅ Found blob token: {blob_token[:10]}...")
             
             # Create a unique filename with session-based folder structure
             content_hash = hashlib.sha256(audio_content).hexdigest()[:12]
@@ -307,7 +376,8 @@ class handler(BaseHTTPRequestHandler):
                 print(f"Available functions: {[attr for attr in dir(vercel_blob) if not attr.startswith('_')]}")
                 raise Exception("vercel_blob.put function not available")
             
-            print(f"✅ vercel_blob.put function found: {vercel_blob.put}")
+            if SPEECH_DEBUG:
+                print(f"✅ vercel_blob.put function found: {vercel_blob.put}")
             
             # Upload to Vercel Blob
             print("🚀 Starting blob upload...")
@@ -321,17 +391,20 @@ class handler(BaseHTTPRequestHandler):
             )
             
             print(f"✅ Blob upload completed to session {session_id}!")
-            print(f"📋 Result type: {type(blob_result)}")
-            print(f"📋 Result: {blob_result}")
+            if SPEECH_DEBUG:
+                print(f"📋 Result type: {type(blob_result)}")
+                print(f"📋 Result: {blob_result}")
             
             # Extract URL from result
             url = None
             if isinstance(blob_result, dict):
                 url = blob_result.get('url') or blob_result.get('downloadUrl')
-                print(f"🔗 Found URL in dict: {url}")
+                if SPEECH_DEBUG:
+                    print(f"🔗 Found URL in dict: {url}")
             else:
                 url = getattr(blob_result, 'url', None) or getattr(blob_result, 'downloadUrl', None)
-                print(f"🔗 Found URL in object: {url}")
+                if SPEECH_DEBUG:
+                    print(f"🔗 Found URL in object: {url}")
             
             if not url:
                 print(f"❌ No URL found in blob result!")
@@ -362,7 +435,7 @@ class handler(BaseHTTPRequestHandler):
             elif response.status_code == 422:
                 if isinstance(detail, dict):
                     if 'voice_id' in str(detail).lower():
-                        return {'message': 'Invalid voice ID. Please check the voice ID is correct'}
+                        return {'message': 'Invalid voice ID. Please check the voice ID is correct', 'invalid_voice': True}
                     elif 'model' in str(detail).lower():
                         return {'message': 'Invalid model specified'}
                 return {'message': f'Invalid request parameters: {detail}'}
@@ -379,27 +452,28 @@ class handler(BaseHTTPRequestHandler):
             return {'message': f'ElevenLabs API error (HTTP {response.status_code})'}
     
     def send_json_response(self, status_code: int, data: dict):
+        # Serialize before writing anything so a failure can still send a clean 500
         try:
+            json_data = json_dumps_bytes(data)
+        except Exception:
+            status_code = 500
+            json_data = json_dumps_bytes({
+                'audioData': '',
+                'success': False,
+                'error': 'Failed to serialize response data'
+            })
+        
+        try:
+            # Headers are buffered until end_headers(), so the whole header
+            # block goes out in one write; Content-Length enables keep-alive
             self.send_response(status_code)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            for header, value in JSON_RESPONSE_HEADERS:
+                self.send_header(header, value)
+            self.send_header('Content-Length', str(len(json_data)))
             self.end_headers()
-            
-            json_data = json.dumps(data).encode('utf-8')
             self.wfile.write(json_data)
-        except Exception as e:
-            # Fallback error response if JSON serialization fails
-            try:
-                error_response = json.dumps({
-                    'audioData': '',
-                    'success': False,
-                    'error': 'Failed to serialize response data'
-                }).encode('utf-8')
-                self.wfile.write(error_response)
-            except:
-                pass  # If even this fails, there's nothing more we can do
+        except Exception:
+            pass  # Client went away; there's nothing more we can do
     
     def send_error_response(self, status_code: int, message: str):
         """Send a standardized error response with enhanced error information"""
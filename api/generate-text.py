@@ -1,11 +1,129 @@
 """
 Vercel serverless function for OpenAI text generation
+
+Requests with "stream": true receive newline-delimited JSON instead of a
+single JSON body: one {"chunk": ..., "index": ...} frame per paragraph as
+soon as it is generated, then a terminal frame with "done": true carrying
+the authoritative motivationalText and chunks.
+
+Responses also carry chunkMeta ({idx, text, wordCount, offset} per chunk).
+Chunks are independent, so callers can synthesize speech for them
+concurrently (ElevenLabs allows a few requests at once) and reassemble by idx.
 """
 
+import functools
+import hashlib
 import json
 import re
+import threading
+from concurrent.futures import Future
 from http.server import BaseHTTPRequestHandler
-import openai
+from urllib.parse import parse_qs, urlparse
+from cachetools import LRUCache, TTLCache
+
+# Prefer orjson for JSON encoding, fall back to the stdlib when unavailable
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+def json_dumps_bytes(data) -> bytes:
+    """Serialize data to UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+def json_loads(raw: bytes):
+    """Parse a UTF-8 JSON request body without decoding it to str first"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+# openai (and httpx, pydantic, ...) are imported on first use rather than at
+# module load, so cold starts that end in a validation error never pay for them
+
+OPENAI_MODEL = 'gpt-5.4'
+MAX_COMPLETION_TOKENS = 1000
+
+# Shared pool sizing; connect timeout is short so a dead socket fails fast
+# and the SDK retries instead of burning the whole request timeout
+HTTP_MAX_CONNECTIONS = 50
+HTTP_MAX_KEEPALIVE = 20
+HTTP_KEEPALIVE_EXPIRY = 60  # seconds
+HTTP_TIMEOUT = 60.0  # seconds
+HTTP_CONNECT_TIMEOUT = 5.0  # seconds
+OPENAI_MAX_RETRIES = 2
+
+# One connection pool shared by every OpenAI client in this container, so warm
+# invocations skip the TCP/TLS handshake (created on first use)
+_HTTP_CLIENT = None
+# OpenAI clients by API key; evicted clients are not closed because closing
+# one would close the shared pool
+_CLIENT_CACHE = LRUCache(maxsize=32)
+
+def get_http_client():
+    """Return the shared httpx pool, creating it on first use"""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        import httpx
+        _HTTP_CLIENT = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+        )
+    return _HTTP_CLIENT
+
+def get_openai_client(api_key: str):
+    """Return a cached OpenAI client for this API key backed by the shared pool"""
+    import openai
+    
+    client = _CLIENT_CACHE.get(api_key)
+    if client is None:
+        client = openai.OpenAI(
+            api_key=api_key,
+            http_client=get_http_client(),
+            max_retries=OPENAI_MAX_RETRIES
+        )
+        _CLIENT_CACHE[api_key] = client
+    return client
+
+# Generated responses for identical prompts, used when the caller sets allowCache
+RESPONSE_CACHE_TTL = 3600  # seconds
+_RESPONSE_CACHE = TTLCache(maxsize=512, ttl=RESPONSE_CACHE_TTL)
+
+# Identical requests arriving while a generation is in flight (client retries,
+# double submits) share that one OpenAI call. Nothing is kept once it
+# finishes, so later requests only reuse results through allowCache.
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+def generate_once(cache_key: str, generate):
+    """Run generate() at most once per key at a time; returns (response, shared)"""
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(cache_key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _INFLIGHT[cache_key] = future
+    
+    if not owner:
+        return future.result(), True
+    
+    try:
+        response = generate()
+        future.set_result(response)
+        return response, False
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(cache_key, None)
 
 def validate_openai_key(api_key: str) -> bool:
     """Validate OpenAI API key format"""
@@ -13,12 +131,21 @@ def validate_openai_key(api_key: str) -> bool:
 
 def create_user_prompt(user_data: dict) -> str:
     """Create user prompt for OpenAI"""
-    name = user_data['name']
-    physical_activity = user_data['physicalActivity']
-    song_title = user_data.get('songTitle')
-    sponsor = user_data.get('sponsor')
-    custom_instructions = user_data.get('customInstructions')
-    
+    return _build_user_prompt(
+        _prompt_value(user_data['name']),
+        _prompt_value(user_data['physicalActivity']),
+        _prompt_value(user_data.get('songTitle')),
+        _prompt_value(user_data.get('sponsor')),
+        _prompt_value(user_data.get('customInstructions'))
+    )
+
+def _prompt_value(value):
+    """Normalize a user field to a hashable value without changing how it renders"""
+    return str(value) if value else None
+
+@functools.lru_cache(maxsize=256)
+def _build_user_prompt(name, physical_activity, song_title, sponsor, custom_instructions) -> str:
+    """Build the user prompt; cached because the same profile is sent repeatedly"""
     prompt = f"Create 5 character-driven motivational pep talks for {name} who is engaged in {physical_activity}."
     
     if song_title:
@@ -42,12 +169,22 @@ Format your response as exactly 5 separate paragraphs with a blank line between
     
     return prompt
 
+def response_cache_key(api_key: str, character_prompt: str, user_prompt: str) -> str:
+    """Key cached responses by caller and prompt without storing either verbatim"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (api_key, character_prompt, user_prompt):
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+SENTENCE_END_RE = re.compile(r'[.!?]+')
+
 def chunk_text(text: str) -> list:
     """Split pre-chunked paragraphs from LLM output"""
     chunks = [p.strip() for p in text.split('\n\n') if p.strip()]
     # Fallback to sentence splitting if paragraphs aren't distinct
     if len(chunks) <= 1:
-        sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
+        sentences = [s.strip() for s in SENTENCE_END_RE.split(text) if s.strip()]
         chunks = []
         current_chunk = ""
         current_word_count = 0
@@ -64,13 +201,51 @@ def chunk_text(text: str) -> list:
             chunks.append(current_chunk.strip())
     return chunks
 
+def chunk_metadata(text: str, chunks: list) -> list:
+    """Describe each chunk so callers can fan out TTS requests in parallel
+
+    offset is the chunk's character index in text, or -1 when the sentence
+    fallback rewrote the punctuation and the chunk no longer appears verbatim.
+    """
+    meta = []
+    position = 0
+    for idx, chunk in enumerate(chunks):
+        offset = text.find(chunk, position)
+        if offset >= 0:
+            position = offset + len(chunk)
+        meta.append({'idx': idx, 'text': chunk, 'wordCount': len(chunk.split()), 'offset': offset})
+    return meta
+
 class handler(BaseHTTPRequestHandler):
+    # Buffer wfile so the header block and a small body leave in one send;
+    # StreamRequestHandler.finish() flushes it after each request
+    wbufsize = -1
+    
+    def do_OPTIONS(self):
+        # Let browsers cache the preflight for a day instead of repeating it per call
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Max-Age', '86400')
+        self.end_headers()
+
+    def do_GET(self):
+        # Scheduled warmup pings keep the container resident without doing any work
+        if parse_qs(urlparse(self.path).query).get('warmup') == ['1']:
+            # Load the SDK and connection pool now so the next real request doesn't
+            import openai  # noqa: F401
+            get_http_client()
+            self.send_json_response(200, {'success': True, 'warm': True})
+            return
+        self.send_error_response(405, 'Method not allowed. Use POST to generate text.')
+    
     def do_POST(self):
         try:
             # Parse request body
             content_length = int(self.headers['Content-Length'])
             post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = json_loads(post_data)
             
             api_key = data.get('apiKey')
             user_data = data.get('userData')
@@ -95,35 +270,60 @@ class handler(BaseHTTPRequestHandler):
             # Create user prompt
             user_prompt = create_user_prompt(user_data)
             
-            # Initialize OpenAI client
-            client = openai.OpenAI(api_key=api_key)
+            # Identical prompts can reuse a previous generation when the caller opts in
+            allow_cache = data.get('allowCache') is True
+            cache_key = response_cache_key(api_key, character_prompt, user_prompt)
+            cached_response = _RESPONSE_CACHE.get(cache_key) if allow_cache else None
+            if cached_response:
+                if data.get('stream') is True:
+                    self._start_stream()
+                    self._write_frame({**cached_response, 'cached': True, 'done': True})
+                else:
+                    self.send_json_response(200, {**cached_response, 'cached': True})
+                return
+            
+            # Initialize OpenAI client (first use imports the SDK)
+            import openai
+            client = get_openai_client(api_key)
+            messages = [
+                {'role': 'system', 'content': character_prompt},
+                {'role': 'user', 'content': user_prompt}
+            ]
             
             # Generate text
             try:
-                completion = client.chat.completions.create(
-                    model='gpt-5.4',
-                    messages=[
-                        {'role': 'system', 'content': character_prompt},
-                        {'role': 'user', 'content': user_prompt}
-                    ],
-                    max_completion_tokens=1000
-                )
-                
-                motivational_text = completion.choices[0].message.content
-                if not motivational_text:
-                    self.send_error_response(500, "No content generated from OpenAI API")
+                if data.get('stream') is True:
+                    self._stream_completion(client, messages, cache_key)
                     return
                 
-                # Chunk the text
-                chunks = chunk_text(motivational_text.strip())
+                def generate():
+                    completion = client.chat.completions.create(
+                        model=OPENAI_MODEL,
+                        messages=messages,
+                        max_completion_tokens=MAX_COMPLETION_TOKENS
+                    )
+                    
+                    motivational_text = completion.choices[0].message.content
+                    if not motivational_text:
+                        return None
+                    
+                    # Chunk the text
+                    chunks = chunk_text(motivational_text.strip())
+                    
+                    return {
+                        'motivationalText': motivational_text.strip(),
+                        'chunks': chunks,
+                        'chunkMeta': chunk_metadata(motivational_text.strip(), chunks),
+                        'success': True
+                    }
                 
-                response = {
-                    'motivationalText': motivational_text.strip(),
-                    'chunks': chunks,
-                    'success': True
-                }
+                response, shared = generate_once(cache_key, generate)
+                if response is None:
+                    self.send_error_response(500, "No content generated from OpenAI API")
+                    return
+                _RESPONSE_CACHE[cache_key] = response
                 
-                self.send_json_response(200, response)
+                self.send_json_response(200, {**response, 'cached': True} if shared else response)
                 
             except openai.AuthenticationError:
                 self.send_error_response(401, 'Invalid or expired OpenAI API key')
@@ -138,6 +338,77 @@ class handler(BaseHTTPRequestHandler):
         except Exception as e:
             self.send_error_response(500, f'An unexpected error occurred: {str(e)}')
     
+    def _stream_completion(self, client, messages: list, cache_key: str):
+        """Stream the completion as NDJSON, emitting each paragraph once it is complete"""
+        # Errors raised by create() (auth, quota) propagate before any bytes are
+        # written, so the caller can still answer with a regular JSON error
+        stream = client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=messages,
+            max_completion_tokens=MAX_COMPLETION_TOKENS,
+            stream=True
+        )
+        
+        self._start_stream()
+        
+        text = ''
+        emitted = 0  # paragraphs already sent as chunk frames
+        try:
+            for event in stream:
+                if not event.choices:
+                    continue
+                delta = event.choices[0].delta.content
+                if not delta:
+                    continue
+                text += delta
+                
+                # Everything before the last blank line is a finished paragraph
+                paragraphs = [p.strip() for p in text.split('\n\n')[:-1] if p.strip()]
+                for paragraph in paragraphs[emitted:]:
+                    self._write_frame({'chunk': paragraph, 'index': emitted})
+                    emitted += 1
+            
+            motivational_text = text.strip()
+            if not motivational_text:
+                self._write_frame({'success': False, 'done': True, 'error': 'No content generated from OpenAI API'})
+                return
+            
+            chunks = chunk_text(motivational_text)
+            response = {
+                'motivationalText': motivational_text,
+                'chunks': chunks,
+                'chunkMeta': chunk_metadata(motivational_text, chunks),
+                'success': True
+            }
+            _RESPONSE_CACHE[cache_key] = response
+            
+            # Send whatever the paragraph scan has not (e.g. the final paragraph)
+            for index in range(emitted, len(response['chunks'])):
+                self._write_frame({'chunk': response['chunks'][index], 'index': index})
+            self._write_frame({**response, 'done': True})
+            
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; stop generating, and don't answer a second time
+            stream.close()
+        except Exception as e:
+            try:
+                self._write_frame({'success': False, 'done': True, 'error': f'OpenAI API error: {str(e)}'})
+            except (BrokenPipeError, ConnectionResetError):
+                stream.close()
+    
+    def _start_stream(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
+    
+    def _write_frame(self, frame: dict):
+        self.wfile.write(json_dumps_bytes(frame) + b'\n')
+        self.wfile.flush()
+    
     def send_json_response(self, status_code: int, data: dict):
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
@@ -145,7 +416,7 @@ class handler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(json_dumps_bytes(data))
     
     def send_error_response(self, status_code: int, message: str):
         response = {
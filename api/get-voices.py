@@ -1,20 +1,108 @@
 from http.server import BaseHTTPRequestHandler
+import hashlib
 import json
 import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cachetools import TTLCache
+
+# Prefer orjson for JSON encoding, fall back to the stdlib when unavailable
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+def json_dumps_bytes(data) -> bytes:
+    """Serialize data to UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+def json_loads(raw: bytes):
+    """Parse a UTF-8 JSON request body without decoding it to str first"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+# Shared session so warm invocations reuse pooled ElevenLabs connections;
+# transient gateway errors are retried with backoff before reaching the caller
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(max_retries=Retry(
+    total=2,
+    backoff_factor=0.3,
+    status_forcelist=[502, 503, 504],
+    allowed_methods=['GET'],
+    raise_on_status=False
+)))
+
+# A request still pending after HEDGE_DELAY gets a second one raced against it
+HEDGE_DELAY = 1.5  # seconds
+_HEDGE_POOL = ThreadPoolExecutor(max_workers=4)
+
+def _close_response(future):
+    """Release the connection held by a hedged request that lost the race"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+def hedged_get(url: str, **kwargs) -> requests.Response:
+    """GET url on the shared session, hedging slow requests with a duplicate"""
+    primary = _HEDGE_POOL.submit(_SESSION.get, url, **kwargs)
+    done, _ = wait([primary], timeout=HEDGE_DELAY)
+    if done:
+        return primary.result()
+    
+    pending = {primary, _HEDGE_POOL.submit(_SESSION.get, url, **kwargs)}
+    first_error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for loser in pending:
+                    loser.add_done_callback(_close_response)
+                return future.result()
+            first_error = first_error or future.exception()
+    raise first_error
+
+# The request body is a tiny {apiKey} object; anything larger is rejected
+# before it is read into memory
+MAX_BODY_BYTES = 8 * 1024
+
+# Voice inventories change rarely; cache them per API key (hashed) for five
+# minutes, and remember invalid keys briefly to stop auth-failure storms
+VOICE_CACHE_TTL = 300  # seconds
+INVALID_KEY_CACHE_TTL = 30  # seconds
+_VOICE_CACHE = TTLCache(maxsize=64, ttl=VOICE_CACHE_TTL)
+_INVALID_KEY_CACHE = TTLCache(maxsize=256, ttl=INVALID_KEY_CACHE_TTL)
+
+def api_key_hash(api_key: str) -> str:
+    """Hash the API key so raw keys are never used as cache keys"""
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()
 
 class handler(BaseHTTPRequestHandler):
+    # Buffer wfile so the header block and a small body leave in one send;
+    # StreamRequestHandler.finish() flushes it after each request
+    wbufsize = -1
+    
     def do_OPTIONS(self):
-        self.send_response(200)
+        # Let browsers cache the preflight for a day instead of repeating it per call
+        self.send_response(204)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Max-Age', '86400')
         self.end_headers()
 
     def do_POST(self):
         try:
             content_length = int(self.headers['Content-Length'])
+            if content_length > MAX_BODY_BYTES:
+                self.send_error_response(413, 'Request body too large')
+                return
             post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = json_loads(post_data)
             
             api_key = data.get('apiKey')
             
@@ -22,6 +110,15 @@ class handler(BaseHTTPRequestHandler):
                 self.send_error_response(400, 'ElevenLabs API key is required')
                 return
             
+            key_hash = api_key_hash(api_key)
+            cached_voices = _VOICE_CACHE.get(key_hash)
+            if cached_voices is not None:
+                self.send_json_response(200, {'voices': cached_voices, 'success': True})
+                return
+            if key_hash in _INVALID_KEY_CACHE:
+                self.send_error_response(401, 'Invalid ElevenLabs API key')
+                return
+            
             headers = {
                 'Accept': 'application/json',
                 'xi-api-key': api_key,
@@ -29,12 +126,13 @@ class handler(BaseHTTPRequestHandler):
             }
             
             try:
-                response = requests.get('https://api.elevenlabs.io/v1/voices', headers=headers, timeout=60)
+                response = hedged_get('https://api.elevenlabs.io/v1/voices', headers=headers, timeout=60)
                 
                 if not response.ok:
                     error_message = 'Failed to retrieve voices from ElevenLabs'
                     if response.status_code == 401:
                         error_message = 'Invalid ElevenLabs API key'
+                        _INVALID_KEY_CACHE[key_hash] = True
                     elif response.status_code == 429:
                         error_message = 'Rate limit exceeded. Please try again later'
                     elif response.status_code == 402:
@@ -55,6 +153,8 @@ class handler(BaseHTTPRequestHandler):
                         'preview_url': voice.get('preview_url')
                     })
                 
+                _VOICE_CACHE[key_hash] = voices
+                
                 response_data = {
                     'voices': voices,
                     'success': True
@@ -77,7 +177,7 @@ class handler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(json_dumps_bytes(data))
     
     def send_error_response(self, status_code: int, message: str):
         response = {
@@ -4,15 +4,57 @@ Combines speech audio with background music
 """
 
 import json
+import re
 import base64
+import binascii
 import tempfile
 import os
 import hashlib
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
 import random
+import multiprocessing
+from fractions import Fraction
+
+# Prefer orjson for JSON encoding, fall back to the stdlib when unavailable
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+def json_dumps_bytes(data) -> bytes:
+    """Serialize data to UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+def json_loads(raw):
+    """Parse a UTF-8 JSON request body (bytes or memoryview) without decoding it to str first"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(str(raw, 'utf-8'))
+
+def read_body(rfile, content_length):
+    """Read the request body into one preallocated buffer; returns a memoryview of the bytes received"""
+    buffer = bytearray(content_length)
+    view = memoryview(buffer)
+    received = 0
+    while received < content_length:
+        count = rfile.readinto(view[received:])
+        if not count:
+            break
+        received += count
+    return view[:received]
 
 # Import PyAV for native FFmpeg support
 try:
@@ -25,6 +67,21 @@ except ImportError as e:
 
 # No pydub needed - PyAV handles all audio processing
 
+# pybase64 decodes with SIMD and accepts str directly; stdlib base64 is the fallback
+try:
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    pybase64 = None
+    PYBASE64_AVAILABLE = False
+
+# mutagen reads MP3 durations from frame headers without opening a demuxer
+try:
+    from mutagen.mp3 import MP3
+    MUTAGEN_AVAILABLE = True
+except ImportError:
+    MUTAGEN_AVAILABLE = False
+
 # Try to import vercel_blob, but handle gracefully if not available
 try:
     import vercel_blob
@@ -36,9 +93,395 @@ except ImportError as e:
     vercel_blob = None
 
 
+def apply_gain(frame, gain_factor):
+    """Scale an fltp frame in place by a linear gain factor, clipping to full scale"""
+    import numpy as np
+    
+    # View the frame's own buffers: no to_ndarray() copy and no new AudioFrame
+    for plane in frame.planes:
+        samples = np.frombuffer(plane, dtype=np.float32, count=frame.samples)
+        samples *= np.float32(gain_factor)
+        np.clip(samples, -1.0, 1.0, out=samples)
+    return frame
+
+
+# Base64 is decoded in slices of this many characters (a multiple of 4)
+B64_DECODE_CHUNK = 4 * 1024 * 1024
+
+def b64decode(encoded, validate=False):
+    """Decode base64 with pybase64 when available"""
+    if PYBASE64_AVAILABLE:
+        return pybase64.b64decode(encoded, validate=validate)
+    return base64.b64decode(encoded, validate=validate)
+
+def b64_to_file(encoded, path):
+    """Decode base64 audio straight to disk a slice at a time, so the full
+    decoded payload never sits in memory next to the base64 string"""
+    with open(path, 'wb') as f:
+        try:
+            for start in range(0, len(encoded), B64_DECODE_CHUNK):
+                f.write(b64decode(encoded[start:start + B64_DECODE_CHUNK], validate=True))
+        except binascii.Error:
+            # Whitespace or stray characters break slice alignment; decode
+            # leniently in one go like before
+            f.seek(0)
+            f.truncate()
+            f.write(b64decode(encoded))
+
+
+def decode_speech_chunk(indexed_chunk, temp_dir):
+    """Decode one (index, base64) speech chunk to speech_{index}.mp3 and return its path"""
+    i, chunk = indexed_chunk
+    speech_path = os.path.join(temp_dir, f'speech_{i}.mp3')
+    b64_to_file(chunk, speech_path)
+    return speech_path
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Upper bound on concurrent blob downloads / base64 decodes per request
+MAX_FETCH_WORKERS = 8
+
+# Shared session so warm invocations reuse pooled blob storage connections;
+# the pool holds one connection per fetch worker and transient gateway errors
+# are retried with backoff
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=MAX_FETCH_WORKERS,
+    pool_maxsize=MAX_FETCH_WORKERS,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=['GET'],
+        raise_on_status=False
+    )
+))
+# Shared so the original audio download can overlap the speech fetches
+_FETCH_POOL = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS)
+
+# Every encoded leg is normalized to 44.1kHz stereo
+OUTPUT_SAMPLE_RATE = 44100
+SAMPLE_TIME_BASE = Fraction(1, OUTPUT_SAMPLE_RATE)
+# Decoded audio is handled as (sample format, layout, rate); fltp is both what
+# the mp3float decoder emits and what libmp3lame accepts, so matching inputs
+# skip resampling and the encoder's own format conversion
+WORKING_AUDIO_FORMAT = ('fltp', 'stereo', OUTPUT_SAMPLE_RATE)
+# Samples per MPEG-1 Layer III frame, used when a packet carries no duration
+MP3_FRAME_SAMPLES = 1152
+# FFmpeg decoder names for MP3 streams that can be packet-copied
+MP3_DECODERS = ('mp3', 'mp3float')
+# MPEG-1 Layer III bitrates (kbps) and sample rates by header index
+MPEG1_L3_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+MPEG1_SAMPLE_RATES = (44100, 48000, 32000)
+# main_data_begin is 9 bits, so a frame never reaches further back than this
+MAX_MAIN_DATA_BEGIN = 511
+# Corrupt packets tolerated per input before decoding of that input stops
+MAX_DECODE_ERRORS = 10
+
+# The one-pass distributed splice encodes the final file itself; LAME -V2 VBR
+# is faster than 128k CBR and transparent for music
+FINAL_VBR_QUALITY = 2
+FF_QP2LAMBDA = 118
+
+# Per-chunk progress lines are only printed when SPLICE_DEBUG is set, so
+# many-chunk requests skip the formatting and stdout writes
+SPLICE_DEBUG = bool(os.environ.get('SPLICE_DEBUG'))
+
+# libmp3lame's compression_level picks its quality/speed trade-off (0 = slowest
+# psychoacoustics, 9 = fastest). Speech legs use a fast setting: the bitrate
+# stays at 128k so voice quality is unchanged, only the encoder search is cheaper
+SPEECH_ENCODER_OPTIONS = {'compression_level': '7'}
+
+# Intermediates go to memory-backed tmpfs when the runtime provides a writable
+# one with room to spare. Blob-URL requests have tiny bodies but download
+# their audio, so the free-space check always keeps SHM_MIN_FREE_BYTES of
+# headroom for inputs whose size is not known yet, on top of a multiple of
+# the body for inline uploads (the decoded input, intermediates and output).
+# Small tmpfs mounts (Docker's default is 64MB) and very large requests stay
+# on /tmp so they can't fail with ENOSPC or exhaust memory.
+SHM_DIR = '/dev/shm'
+SHM_MAX_REQUEST_BYTES = 256 * 1024 * 1024
+SHM_MIN_FREE_BYTES = 512 * 1024 * 1024
+SHM_BYTES_PER_REQUEST_BYTE = 4
+
+def scratch_base_dir(request_bytes):
+    """Return the directory to create temp dirs in, or None for the default"""
+    if request_bytes > SHM_MAX_REQUEST_BYTES:
+        return None
+    if not (os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK)):
+        return None
+    try:
+        stats = os.statvfs(SHM_DIR)
+    except OSError:
+        return None
+    if stats.f_bavail * stats.f_frsize < SHM_MIN_FREE_BYTES + request_bytes * SHM_BYTES_PER_REQUEST_BYTE:
+        return None
+    return SHM_DIR
+
+# Request bodies are JSON (fetch sends string bodies as text/plain unless told
+# otherwise) or multipart/form-data
+ACCEPTED_MEDIA_TYPES = ('', 'application/json', 'text/plain', 'multipart/form-data')
+
+# Form fields that arrive as text in multipart uploads but are numbers in JSON
+NUMERIC_FORM_FIELDS = ('musicDuration', 'crossfadeDuration')
+# Form fields that are lists in JSON: sent as repeated parts (optionally named
+# "field[]") or as one part holding a JSON array
+LIST_FORM_FIELDS = ('speechAudioUrls', 'speechAudio')
+# Blank line ending a multipart part's header block
+PART_HEADER_END = re.compile(rb'\r\n\r\n')
+
+def parse_multipart_form(content_type, body):
+    """Split a multipart/form-data body into (text fields, {name: [file data]})
+
+    The body is split on the boundary in place: file parts are memoryview
+    slices of it and only the small part header blocks are copied.
+    """
+    boundary = BytesParser(policy=HTTP).parsebytes(
+        b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n', headersonly=True
+    ).get_boundary()
+    if not boundary:
+        raise ValueError('Missing multipart boundary')
+    # A delimiter line, or the closing one when followed by "--"
+    delimiter = re.compile(rb'(?:\A|\r\n)--' + re.escape(boundary.encode('latin-1')) + rb'(--|[ \t]*\r\n)')
+    
+    fields = {}
+    uploads = {}
+    part_start = None
+    closed = False
+    for match in delimiter.finditer(body):
+        if part_start is not None:
+            add_form_part(body[part_start:match.start()], fields, uploads)
+        if match.group(1) == b'--':
+            closed = True
+            break
+        part_start = match.end()
+    if not closed:
+        raise ValueError('Malformed multipart/form-data body')
+    return fields, uploads
+
+def add_form_part(part, fields, uploads):
+    """Parse one multipart part (a memoryview) into fields or uploads"""
+    if part[:2] == b'\r\n':
+        header_end, payload_start = 0, 2  # no headers
+    else:
+        match = PART_HEADER_END.search(part)
+        if match is None:
+            raise ValueError('Malformed multipart/form-data part')
+        header_end, payload_start = match.start() + 2, match.end()
+    headers = BytesParser(policy=HTTP).parsebytes(bytes(part[:header_end]) + b'\r\n', headersonly=True)
+    name = headers.get_param('name', header='content-disposition')
+    if not name:
+        return
+    payload = part[payload_start:]
+    if headers.get_filename() is not None:
+        uploads.setdefault(name.removesuffix('[]'), []).append(payload)
+    else:
+        name = name.removesuffix('[]')
+        value = str(payload, 'utf-8')
+        if name in LIST_FORM_FIELDS:
+            values = fields.setdefault(name, [])
+            if value.startswith('['):
+                values.extend(json_loads(value))
+            else:
+                values.append(value)
+        else:
+            fields[name] = float(value) if name in NUMERIC_FORM_FIELDS and value else value
+
+def is_string_list(value):
+    """True for a list whose items are all strings"""
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+def mp3_side_info(frame):
+    """Parse an MPEG-1 Layer III frame; returns (main data offset, main_data_begin,
+    main data bytes used by this frame) or None for anything else"""
+    if len(frame) < 4 or frame[0] != 0xFF or (frame[1] & 0xFE) != 0xFA:
+        return None
+    channels = 1 if frame[3] >> 6 == 3 else 2
+    side_offset = 4 if frame[1] & 1 else 6  # 2 CRC bytes follow the header when protected
+    side_length = 17 if channels == 1 else 32
+    if len(frame) < side_offset + side_length:
+        return None
+    bits = int.from_bytes(frame[side_offset:side_offset + side_length], 'big')
+    total_bits = side_length * 8
+    main_data_begin = bits >> (total_bits - 9)
+    # Per granule and channel: 59 bits starting with the 12-bit part2_3_length,
+    # after main_data_begin, the private bits and the scfsi flags
+    position = 18 if channels == 1 else 20
+    used_bits = 0
+    for _ in range(2 * channels):
+        used_bits += (bits >> (total_bits - position - 12)) & 0xFFF
+        position += 59
+    return side_offset + side_length, main_data_begin, (used_bits + 7) // 8
+
+def self_contained_mp3_frame(frame, reservoir, next_main_data_begin):
+    """Rebuild an MPEG-1 Layer III frame that follows a splice so it no longer
+    borrows from the bit reservoir
+
+    reservoir holds the original stream's main data before this frame. The
+    rebuilt frame carries its own main data with main_data_begin = 0, then the
+    bytes the next original frame reaches back for, in a slot enlarged to a
+    higher bitrate if needed. Returns None when even 320 kbps is too small.
+    """
+    main_offset, main_data_begin, used = mp3_side_info(frame)
+    if main_data_begin > len(reservoir):
+        return None
+    stream = reservoir + frame[main_offset:]
+    start = len(reservoir) - main_data_begin
+    own = stream[start:start + used]
+    borrowed = stream[len(stream) - next_main_data_begin:] if next_main_data_begin else b''
+    if start + used > len(stream) - next_main_data_begin:
+        return None
+    
+    side_info = bytearray(frame[main_offset - (17 if frame[3] >> 6 == 3 else 32):main_offset])
+    side_info[0] = 0
+    side_info[1] &= 0x7F
+    needed = 4 + len(side_info) + len(own) + len(borrowed)
+    sample_rate_index = (frame[2] >> 2) & 3
+    for bitrate_index in range(1, len(MPEG1_L3_BITRATES)):
+        size = 144000 * MPEG1_L3_BITRATES[bitrate_index] // MPEG1_SAMPLE_RATES[sample_rate_index]
+        if size >= needed:
+            # No CRC, no padding bit; keep the sample rate, private bit and mode byte
+            header = bytes((0xFF, 0xFB, bitrate_index << 4 | sample_rate_index << 2 | frame[2] & 1, frame[3]))
+            return header + side_info + own + bytes(size - needed) + borrowed
+    return None
+
+# Seconds a batch of forked jobs may run before stragglers are killed
+FORKED_JOB_TIMEOUT = 60
+
+def run_forked(jobs):
+    """Run (fn, args) jobs in forked child processes, one CPU's worth at a time
+
+    Forking never pickles fn, and unlike ProcessPoolExecutor it needs no POSIX
+    semaphores, which runtimes without /dev/shm (Lambda) cannot create. Jobs
+    run in-process on single-CPU hosts, and any job whose child fails, cannot
+    be started, or is still running after FORKED_JOB_TIMEOUT (a lock held by
+    another thread at fork time can deadlock it) is retried in-process so its
+    errors surface normally.
+    """
+    workers = os.cpu_count() or 1
+    if workers < 2 or len(jobs) < 2 or 'fork' not in multiprocessing.get_all_start_methods():
+        for fn, args in jobs:
+            fn(*args)
+        return
+    
+    context = multiprocessing.get_context('fork')
+    failed = []
+    for start in range(0, len(jobs), workers):
+        running = []
+        for job in jobs[start:start + workers]:
+            try:
+                process = context.Process(target=job[0], args=job[1])
+                process.start()
+                running.append((job, process))
+            except OSError as e:
+                print(f"⚠️ Could not fork worker: {str(e)}")
+                failed.append(job)
+        deadline = time.monotonic() + FORKED_JOB_TIMEOUT
+        for job, process in running:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                print("⚠️ Worker timed out, running its job in-process")
+                process.terminate()
+                process.join(1)
+                if process.is_alive():
+                    process.kill()
+                    process.join()
+            if process.exitcode != 0:
+                failed.append(job)
+    
+    for fn, args in failed:
+        fn(*args)
+
+def id3_tag_sizes(input_path):
+    """Return (leading ID3v2 tag size, trailing ID3v1 tag size) of an MP3 file in bytes"""
+    with open(input_path, 'rb') as infile:
+        size = os.fstat(infile.fileno()).st_size
+        header = infile.read(10)
+        head = 0
+        if len(header) == 10 and header[:3] == b'ID3':
+            # Tag size is a 28-bit synchsafe integer (7 bits per byte) excluding
+            # the 10-byte header, plus a 10-byte footer when flag bit 4 is set
+            head = 10 + (((header[6] & 0x7f) << 21) | ((header[7] & 0x7f) << 14) |
+                         ((header[8] & 0x7f) << 7) | (header[9] & 0x7f))
+            if header[5] & 0x10:
+                head += 10
+        tail = 0
+        if size - head >= 128:
+            infile.seek(size - 128)
+            if infile.read(3) == b'TAG':
+                tail = 128
+    return min(head, size), tail
+
+def append_file(outfile, input_path, offset=0, trim_end=0):
+    """Append input_path from offset, minus trim_end trailing bytes, to the open binary file outfile"""
+    outfile.flush()
+    with open(input_path, 'rb') as infile:
+        size = os.fstat(infile.fileno()).st_size - trim_end
+        try:
+            while offset < size:
+                sent = os.sendfile(outfile.fileno(), infile.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError:
+            # sendfile can't serve every file pair; copy the rest through userspace
+            infile.seek(offset)
+            remaining = size - offset
+            while remaining > 0:
+                chunk = infile.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                outfile.write(chunk)
+                remaining -= len(chunk)
+
+def read_file_hashed(path):
+    """Read a file into one preallocated buffer, hashing each chunk while it is
+    still in cache; returns (content, 12-char SHA-256 prefix)"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        content = bytearray(os.fstat(f.fileno()).st_size)
+        view = memoryview(content)
+        received = 0
+        while received < len(content):
+            count = f.readinto(view[received:received + DOWNLOAD_CHUNK_SIZE])
+            if not count:
+                break
+            hasher.update(view[received:received + count])
+            received += count
+        view.release()
+    del content[received:]
+    return content, hasher.hexdigest()[:12]
+
+def write_file(data, path):
+    """Write raw bytes to path and return the path"""
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
 
 class handler(BaseHTTPRequestHandler):
+    # Buffer wfile so the header block and a small body leave in one send;
+    # StreamRequestHandler.finish() flushes it after each request
+    wbufsize = -1
+    
+    def do_OPTIONS(self):
+        # Let browsers cache the preflight for a day instead of repeating it per call
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Max-Age', '86400')
+        self.end_headers()
+
+    def do_GET(self):
+        # Scheduled warmup pings keep the container resident without doing any work
+        if parse_qs(urlparse(self.path).query).get('warmup') == ['1']:
+            self.send_json_response(200, {'success': True, 'warm': True})
+            return
+        self.send_error_response(405, 'Method not allowed. Use POST to splice audio.')
+    
     def do_POST(self):
+        # Durations by absolute path, filled as files are probed during this request
+        self._duration_cache = {}
         try:
             # PyAV provides native FFmpeg support - no external binaries needed
             if PYAV_AVAILABLE:
@@ -46,13 +489,23 @@ class handler(BaseHTTPRequestHandler):
             else:
                 print("❌ PyAV not available - audio processing will fail")
             
-            # Validate Content-Length header
-            if 'Content-Length' not in self.headers:
+            # Reject bodies that can't be parsed before reading (possibly
+            # many megabytes of) them
+            content_type = self.headers.get('Content-Type', '')
+            media_type = content_type.split(';', 1)[0].strip().lower()
+            if media_type not in ACCEPTED_MEDIA_TYPES:
+                self.send_error_response(415, f'Unsupported Content-Type: {media_type}')
+                return
+            
+            # Validate Content-Length header (looked up once; HTTPMessage
+            # lookups scan every header)
+            content_length_header = self.headers.get('Content-Length')
+            if content_length_header is None:
                 self.send_error_response(400, 'Missing Content-Length header')
                 return
             
             try:
-                content_length = int(self.headers['Content-Length'])
+                content_length = int(content_length_header)
             except ValueError:
                 self.send_error_response(400, 'Invalid Content-Length header')
                 return
@@ -62,36 +515,66 @@ class handler(BaseHTTPRequestHandler):
             print(f"Splice request body size: {request_size_mb:.2f}MB")
             
             # Parse request body
-            post_data = self.rfile.read(content_length)
+            post_data = read_body(self.rfile, content_length)
             if len(post_data) != content_length:
                 self.send_error_response(400, 'Incomplete request body received')
                 return
                 
-            try:
-                data = json.loads(post_data.decode('utf-8'))
-            except json.JSONDecodeError as e:
-                self.send_error_response(400, f'Invalid JSON in request body: {str(e)}')
-                return
-            except UnicodeDecodeError:
-                self.send_error_response(400, 'Invalid UTF-8 encoding in request body')
-                return
+            # Multipart uploads carry the MP3s as raw binary parts, skipping
+            # the base64 inflation and decode of the JSON body
+            uploads = {}
+            if media_type == 'multipart/form-data':
+                try:
+                    data, uploads = parse_multipart_form(content_type, post_data)
+                except ValueError as e:
+                    self.send_error_response(400, f'Invalid multipart request body: {str(e)}')
+                    return
+            else:
+                try:
+                    data = json_loads(post_data)
+                except json.JSONDecodeError as e:
+                    self.send_error_response(400, f'Invalid JSON in request body: {str(e)}')
+                    return
+                except UnicodeDecodeError:
+                    self.send_error_response(400, 'Invalid UTF-8 encoding in request body')
+                    return
             
-            # Support both blob URLs and base64 data for backward compatibility
-            original_audio_b64 = data.get('originalAudio')
+            # The raw body is no longer needed; release it before decoding audio
+            post_data.release()
+            del post_data
+            
+            # Support blob URLs, multipart uploads and base64 data.
+            # Base64 payloads are popped so only one reference exists and each
+            # can be freed as soon as it has been decoded to disk.
+            original_audio_b64 = data.pop('originalAudio', None)
             original_audio_url = data.get('originalAudioUrl')
-            speech_audio_b64 = data.get('speechAudio')
+            speech_audio_b64 = data.pop('speechAudio', None)
             speech_audio_urls = data.get('speechAudioUrls')
+            original_audio_upload = uploads.get('originalAudio', [None])[0]
+            speech_audio_uploads = uploads.pop('speechAudio', None)
             splice_mode = data.get('spliceMode', 'intro')
             crossfade_duration = data.get('crossfadeDuration', 2.0)
             music_duration = data.get('musicDuration')
             session_id = data.get('sessionId')
             
             # Check if we have either base64 data or blob URLs
-            has_original = original_audio_b64 or original_audio_url
-            has_speech = speech_audio_b64 or speech_audio_urls
+            has_original = original_audio_b64 or original_audio_url or original_audio_upload
+            has_speech = speech_audio_b64 or speech_audio_urls or speech_audio_uploads
             
             if not all([has_original, has_speech]):
-                self.send_error_response(400, 'Both original audio and speech audio are required (as base64 or blob URLs)')
+                self.send_error_response(400, 'Both original audio and speech audio are required (as base64, uploads or blob URLs)')
+                return
+            
+            # Lists are fanned out one download/decode per item, so a string
+            # here would start one job per character
+            if speech_audio_urls is not None and not is_string_list(speech_audio_urls):
+                self.send_error_response(400, 'speechAudioUrls must be a list of URLs')
+                return
+            if speech_audio_b64 is not None and not (isinstance(speech_audio_b64, str) or is_string_list(speech_audio_b64)):
+                self.send_error_response(400, 'speechAudio must be a base64 string or a list of them')
+                return
+            if not all(isinstance(value, (str, type(None))) for value in (original_audio_b64, original_audio_url)):
+                self.send_error_response(400, 'originalAudio and originalAudioUrl must be strings')
                 return
             
             if not session_id:
@@ -99,18 +582,23 @@ class handler(BaseHTTPRequestHandler):
                 return
             
             # Create temporary directory for processing
-            with tempfile.TemporaryDirectory() as temp_dir:
+            with tempfile.TemporaryDirectory(dir=scratch_base_dir(content_length)) as temp_dir:
                 # Get original audio data (from blob URL or base64)
+                original_path = os.path.join(temp_dir, 'original.mp3')
+                original_download = None
                 if original_audio_url:
                     print("Using original audio from blob URL")
-                    original_audio_data = self._download_from_blob_url(original_audio_url)
+                    # Downloads in the background while the speech is fetched
+                    original_download = _FETCH_POOL.submit(self._download_from_blob_url, original_audio_url, original_path)
+                elif original_audio_upload:
+                    print("Using original audio from multipart upload")
+                    write_file(original_audio_upload, original_path)
+                    original_audio_upload = None
+                    uploads.clear()
                 else:
                     print("Using original audio from base64")
-                    original_audio_data = base64.b64decode(original_audio_b64)
-                
-                original_path = os.path.join(temp_dir, 'original.mp3')
-                with open(original_path, 'wb') as f:
-                    f.write(original_audio_data)
+                    b64_to_file(original_audio_b64, original_path)
+                    original_audio_b64 = None
                 
                 # Handle speech audio (from blob URLs or base64)
                 speech_paths = []
@@ -119,44 +607,49 @@ class handler(BaseHTTPRequestHandler):
                 if speech_audio_urls:
                     print(f"Using {len(speech_audio_urls)} speech chunks from blob URLs")
                     has_multiple_chunks = len(speech_audio_urls) > 1
-                    # Multiple speech chunks from blob URLs
-                    for i, url in enumerate(speech_audio_urls):
-                        speech_data = self._download_from_blob_url(url)
-                        speech_path = os.path.join(temp_dir, f'speech_{i}.mp3')
-                        with open(speech_path, 'wb') as f:
-                            f.write(speech_data)
-                        speech_paths.append(speech_path)
+                    # Multiple speech chunks from blob URLs, fetched concurrently
+                    # (map() keeps the original chunk order)
+                    def fetch_speech_chunk(indexed_url):
+                        i, url = indexed_url
+                        return self._download_from_blob_url(url, os.path.join(temp_dir, f'speech_{i}.mp3'))
+                    
+                    speech_paths = list(_FETCH_POOL.map(fetch_speech_chunk, enumerate(speech_audio_urls)))
+                    
+                elif speech_audio_uploads:
+                    print(f"Using {len(speech_audio_uploads)} speech chunks from multipart upload")
+                    has_multiple_chunks = len(speech_audio_uploads) > 1
+                    for i, chunk in enumerate(speech_audio_uploads):
+                        speech_paths.append(write_file(chunk, os.path.join(temp_dir, f'speech_{i}.mp3')))
+                    speech_audio_uploads = None
                     
                 elif isinstance(speech_audio_b64, list):
                     print(f"Using {len(speech_audio_b64)} speech chunks from base64")
                     has_multiple_chunks = len(speech_audio_b64) > 1
-                    # Multiple speech chunks from base64
-                    for i, chunk in enumerate(speech_audio_b64):
-                        speech_data = base64.b64decode(chunk)
-                        speech_path = os.path.join(temp_dir, f'speech_{i}.mp3')
-                        with open(speech_path, 'wb') as f:
-                            f.write(speech_data)
-                        speech_paths.append(speech_path)
+                    # Multiple speech chunks from base64, decoded and written
+                    # concurrently (map() keeps the original chunk order)
+                    speech_paths = list(_FETCH_POOL.map(
+                        lambda indexed_chunk: decode_speech_chunk(indexed_chunk, temp_dir),
+                        enumerate(speech_audio_b64)
+                    ))
+                    speech_audio_b64 = None
                     
                 else:
                     print("Using single speech chunk from base64")
                     # Single speech chunk from base64
-                    speech_data = base64.b64decode(speech_audio_b64)
                     speech_path = os.path.join(temp_dir, 'speech.mp3')
-                    with open(speech_path, 'wb') as f:
-                        f.write(speech_data)
+                    b64_to_file(speech_audio_b64, speech_path)
+                    speech_audio_b64 = None
                     speech_paths.append(speech_path)
                 
+                if original_download is not None:
+                    original_download.result()
+                
                 # Get audio durations
                 original_duration = self.get_audio_duration(original_path)
                 
-                # For backward compatibility, create a combined speech file for duration calculation
-                if has_multiple_chunks:
-                    combined_speech_path = os.path.join(temp_dir, 'combined_speech.mp3')
-                    self.concatenate_audio_files(speech_paths, combined_speech_path, temp_dir)
-                    speech_duration = self.get_audio_duration(combined_speech_path)
-                else:
-                    speech_duration = self.get_audio_duration(speech_paths[0])
+                # Total speech is the sum of its chunks; the per-chunk durations
+                # are cached for the distributed splice
+                speech_duration = sum(self.get_audio_duration(path) for path in speech_paths)
                 
                 # Create output path
                 output_path = os.path.join(temp_dir, 'final.mp3')
@@ -170,11 +663,9 @@ class handler(BaseHTTPRequestHandler):
                     elif splice_mode == 'intro':
                         # For intro mode, concatenate chunks first then add to beginning
                         if has_multiple_chunks:
-                            combined_speech_path = os.path.join(temp_dir, 'combined_speech.mp3')
-                            self.concatenate_audio_files(speech_paths, combined_speech_path, temp_dir)
-                            # Apply 8dB volume gain to combined speech
+                            # Concatenate and apply 8dB volume gain in the same pass
                             gained_speech_path = os.path.join(temp_dir, 'gained_combined_speech.mp3')
-                            self._apply_volume_gain(combined_speech_path, gained_speech_path, 8.0)
+                            self.concatenate_audio_files(speech_paths, gained_speech_path, gain_db=8.0)
                             self.splice_intro(gained_speech_path, original_path, output_path)
                         else:
                             # Apply 8dB volume gain to single speech chunk
@@ -197,11 +688,9 @@ class handler(BaseHTTPRequestHandler):
                     print("🔄 Falling back to simple concatenation...")
                     # Fallback: simple concatenation of all speech + music
                     if has_multiple_chunks:
-                        combined_speech_path = os.path.join(temp_dir, 'combined_speech.mp3')
-                        self.concatenate_audio_files(speech_paths, combined_speech_path, temp_dir)
-                        # Apply 8dB volume gain to combined speech
+                        # Concatenate and apply 8dB volume gain in the same pass
                         gained_speech_path = os.path.join(temp_dir, 'gained_combined_speech.mp3')
-                        self._apply_volume_gain(combined_speech_path, gained_speech_path, 8.0)
+                        self.concatenate_audio_files(speech_paths, gained_speech_path, gain_db=8.0)
                         self.splice_simple_concat(gained_speech_path, original_path, output_path)
                     else:
                         # Apply 8dB volume gain to single speech chunk
@@ -209,15 +698,21 @@ class handler(BaseHTTPRequestHandler):
                         self._apply_volume_gain(speech_paths[0], gained_speech_path, 8.0)
                         self.splice_simple_concat(gained_speech_path, original_path, output_path)
                 
-                # Apply music duration limit if specified
+                # Apply music duration limit if specified. Every mode plays all
+                # of the speech and all of the music, so the limit is the music
+                # plus the inserted speech; skip the pass when the result fits
+                estimated_duration = original_duration + speech_duration
                 if music_duration:
-                    limited_path = os.path.join(temp_dir, 'limited.mp3')
-                    self.limit_duration(output_path, limited_path, music_duration)
-                    output_path = limited_path
+                    max_duration = float(music_duration) + speech_duration
+                    if estimated_duration <= max_duration + 0.1:
+                        print(f"Output ({estimated_duration:.2f}s) within duration limit ({max_duration:.2f}s), skipping limit")
+                    else:
+                        limited_path = os.path.join(temp_dir, 'limited.mp3')
+                        self.limit_duration(output_path, limited_path, max_duration)
+                        output_path = limited_path
                 
                 # Read final audio
-                with open(output_path, 'rb') as f:
-                    final_audio_data = f.read()
+                final_audio_data, content_hash = read_file_hashed(output_path)
                 
                 audio_size_mb = len(final_audio_data) / (1024 * 1024)
                 print(f"Final spliced audio: {audio_size_mb:.2f}MB")
@@ -237,7 +732,7 @@ class handler(BaseHTTPRequestHandler):
                 # Upload to blob storage (ONLY method)
                 try:
                     print(f"Uploading {audio_size_mb:.2f}MB final audio to blob storage")
-                    blob_url = self._upload_to_blob_storage(final_audio_data, session_id)
+                    blob_url = self._upload_to_blob_storage(final_audio_data, session_id, content_hash)
                     response_data = {
                         'finalAudioUrl': blob_url,
                         'success': True,
@@ -261,88 +756,31 @@ class handler(BaseHTTPRequestHandler):
         except Exception as e:
             self.send_error_response(500, f'Audio splicing error: {str(e)}')
     
-    def concatenate_audio_files(self, input_paths, output_path, temp_dir=None):
-        """Concatenate audio files using PyAV (simplified binary approach)"""
+    def concatenate_audio_files(self, input_paths, output_path, gain_db=None):
+        """Concatenate audio files into one MP3 in a single decode/encode pass, optionally applying gain"""
         if not PYAV_AVAILABLE:
             raise Exception("PyAV not available - cannot perform audio concatenation")
             
         try:
-            print(f"Concatenating {len(input_paths)} audio files using PyAV (binary method)")
+            print(f"Concatenating {len(input_paths)} audio files using PyAV (single pass)")
+            gain_factor = 10 ** (gain_db / 20.0) if gain_db else None
             
-            # Use temp_dir if provided, otherwise use directory of output_path
-            if temp_dir is None:
-                temp_dir = os.path.dirname(output_path) or '.'
-            
-            # Simple approach: use PyAV to convert each file to a standard format, then concatenate
-            temp_files = []
-            
-            # Convert each input to a standard format
-            for i, input_path in enumerate(input_paths):
-                temp_path = os.path.join(temp_dir, f"temp_audio_{i}.mp3")
-                temp_files.append(temp_path)
-                
-                print(f"Converting speech chunk {i+1} to standard format")
-                
-                # Convert to standard MP3 format
-                input_container = av.open(input_path)
-                output_container = av.open(temp_path, mode='w')
-                
-                # Add audio stream with standard settings
-                input_stream = input_container.streams.audio[0]
-                output_stream = output_container.add_stream('mp3', rate=44100, layout='stereo')
-                
-                # Create resampler if needed
-                resampler = None
-                if input_stream.sample_rate != 44100 or input_stream.layout.name != 'stereo':
-                    resampler = av.audio.resampler.AudioResampler(
-                        format='s16',     # Target format
-                        layout='stereo',  # Target layout
-                        rate=44100        # Target sample rate
-                    )
-                    print(f"Created resampler for concatenation: {input_stream.sample_rate}Hz {input_stream.layout.name} -> 44100Hz stereo")
-                
-                # Copy and convert frames
-                for frame in input_container.decode(input_stream):
-                    # Resample if needed
-                    if resampler:
-                        resampled_frames = resampler.resample(frame)
-                        for resampled_frame in resampled_frames:
-                            # Encode and write
-                            for packet in output_stream.encode(resampled_frame):
-                                output_container.mux(packet)
-                    else:
-                        # No resampling needed
-                        for packet in output_stream.encode(frame):
-                            output_container.mux(packet)
-                
-                # Flush resampler if used
-                if resampler:
-                    remaining_frames = resampler.resample(None)  # Flush
-                    for frame in remaining_frames:
-                        for packet in output_stream.encode(frame):
-                            output_container.mux(packet)
-                
-                # Flush encoder
-                for packet in output_stream.encode():
-                    output_container.mux(packet)
-                
-                input_container.close()
-                output_container.close()
+            # Matching MP3s without gain are joined by packet copy
+            if not gain_factor and not any(map(self._path_needs_transcode, input_paths)):
+                self._concat_copy(input_paths, output_path)
+                print(f"✅ PyAV concatenation completed (stream copy): {output_path}")
+                return
             
-            # Now concatenate the standardized files using binary method
-            print("Concatenating standardized audio files...")
-            with open(output_path, 'wb') as outfile:
-                for i, temp_path in enumerate(temp_files):
-                    print(f"Adding standardized chunk {i+1}")
-                    with open(temp_path, 'rb') as infile:
-                        # Skip ID3 tags for files after the first one
-                        if i > 0:
-                            # Simple heuristic: skip first 1024 bytes which often contain ID3 tags
-                            infile.seek(1024)
-                        outfile.write(infile.read())
-                    
-                    # Clean up temp file
-                    os.remove(temp_path)
+            output_container, output_stream = self._open_output(output_path, options=SPEECH_ENCODER_OPTIONS)
+            with output_container:
+                # Chunks from the same TTS voice share a format, so they share a resampler
+                shared_resampler = {}
+                for i, input_path in enumerate(input_paths):
+                    if SPLICE_DEBUG:
+                        print(f"Adding speech chunk {i+1}")
+                    self._encode_frames(self._decoded_frames(input_path, shared_resampler), output_container, output_stream, gain_factor)
+                self._encode_frames(self._flush_resampler(shared_resampler), output_container, output_stream, gain_factor)
+                self._encode_frames(None, output_container, output_stream)
             
             print(f"✅ PyAV concatenation completed: {output_path}")
             
@@ -350,22 +788,39 @@ class handler(BaseHTTPRequestHandler):
             print(f"❌ PyAV concatenation failed: {str(e)}")
             raise Exception(f"Audio concatenation failed: {str(e)}. PyAV processing error.")
     
-
-    
     def get_audio_duration(self, audio_path):
+        """Get audio duration, probing each file at most once per request"""
+        key = os.path.abspath(audio_path)
+        if key not in self._duration_cache:
+            self._duration_cache[key] = self._probe_duration(audio_path)
+        return self._duration_cache[key]
+    
+    def _probe_duration(self, audio_path):
         """Get audio duration using PyAV with robust fallback mechanisms"""
         if not PYAV_AVAILABLE:
             raise Exception("PyAV not available - cannot get audio duration")
         
         # Try multiple methods to get duration, with fallbacks
         
+        # Method 0: Read the MP3 frame headers directly (no demuxer setup)
+        if MUTAGEN_AVAILABLE:
+            try:
+                duration_seconds = MP3(audio_path).info.length
+                if duration_seconds > 0:
+                    if SPLICE_DEBUG:
+                        print(f"Audio duration (mp3 header): {duration_seconds:.2f} seconds")
+                    return duration_seconds
+            except Exception as e:
+                print(f"⚠️ MP3 header duration failed: {str(e)}")
+        
         # Method 1: Try container duration
         try:
             container = av.open(audio_path)
             if container.duration is not None and container.duration > 0:
                 duration_seconds = float(container.duration) / av.time_base
                 container.close()
-                print(f"Audio duration (container): {duration_seconds:.2f} seconds")
+                if SPLICE_DEBUG:
+                    print(f"Audio duration (container): {duration_seconds:.2f} seconds")
                 return duration_seconds
             
             # Method 2: Try stream duration
@@ -374,7 +829,8 @@ class handler(BaseHTTPRequestHandler):
                 if audio_stream.duration is not None and audio_stream.duration > 0:
                     duration_seconds = float(audio_stream.duration * audio_stream.time_base)
                     container.close()
-                    print(f"Audio duration (stream): {duration_seconds:.2f} seconds")
+                    if SPLICE_DEBUG:
+                        print(f"Audio duration (stream): {duration_seconds:.2f} seconds")
                     return duration_seconds
             
             container.close()
@@ -427,7 +883,8 @@ class handler(BaseHTTPRequestHandler):
                 duration = self.get_audio_duration(chunk_path)
                 speech_durations.append(duration)
                 total_speech_duration += duration
-                print(f"Speech chunk {i+1}: {duration:.1f}s")
+                if SPLICE_DEBUG:
+                    print(f"Speech chunk {i+1}: {duration:.1f}s")
             
             print(f"Total speech duration: {total_speech_duration:.1f}s")
             print(f"Music duration: {music_duration:.1f}s")
@@ -462,68 +919,26 @@ class handler(BaseHTTPRequestHandler):
             
             print(f"Insertion points in original music: {[f'{p:.1f}s' for p in insertion_points]}")
             
-            # Split music into segments WITHOUT skipping any content
-            music_segments = self._split_music_for_insertion(music_path, insertion_points, temp_dir)
-            
-            # Convert all speech chunks to standard format AND apply 3dB volume gain
-            converted_speech = []
-            for i, chunk_path in enumerate(speech_chunks):
-                temp_speech = os.path.join(temp_dir, f"temp_speech_{i}.mp3")
-                self._convert_to_standard_format(chunk_path, temp_speech)
-                
-                # Apply 8dB volume gain to match Colab implementation
-                gained_speech = os.path.join(temp_dir, f"gained_speech_{i}.mp3")
-                self._apply_volume_gain(temp_speech, gained_speech, 8.0)
-                converted_speech.append(gained_speech)
-            
-            # Interleave music segments and speech chunks at calculated insertion points
+            # Walk the music once, writing each speech chunk into the output as
+            # playback reaches its insertion point:
+            # music_1 + speech_1 + music_2 + speech_2 + ... + final music
+            speech_gain_db = 8.0  # matches the Colab implementation
+            speech_gain = 10 ** (speech_gain_db / 20.0)
             print("Creating final audio with evenly distributed speech chunks...")
-            temp_files_to_concat = []
-            
-            # Pattern: music_segment_1 + speech_1 + music_segment_2 + speech_2 + ... + final_music_segment
-            # Each speech chunk is placed at its calculated insertion point
+            if not self._path_needs_transcode(music_path) and self._seams_rebuildable(music_path, insertion_points):
+                # Standard MP3 music is copied packet by packet; only speech is encoded
+                try:
+                    self._splice_distributed_copy(speech_chunks, music_path, output_path, insertion_points, speech_gain_db, temp_dir)
+                except ValueError as e:
+                    print(f"⚠️ Stream-copy splice not possible ({str(e)}), re-encoding")
+                    self._splice_distributed_transcode(speech_chunks, music_path, output_path, insertion_points, speech_gain)
+            else:
+                self._splice_distributed_transcode(speech_chunks, music_path, output_path, insertion_points, speech_gain)
             
-            for i in range(len(insertion_points)):
-                # Add music segment (from previous insertion point to current)
-                if i < len(music_segments) and music_segments[i]:
-                    temp_files_to_concat.append(music_segments[i])
-                    print(f"Added music segment {i+1}")
-                
-                # Add speech chunk at its calculated insertion point
-                if i < len(converted_speech):
-                    temp_files_to_concat.append(converted_speech[i])
-                    print(f"Added speech chunk {i+1} at insertion point {insertion_points[i]:.1f}s")
-            
-            # Add final music segment (from last insertion point to end)
-            if len(music_segments) > len(insertion_points):
-                final_segment = music_segments[-1]
-                if final_segment:
-                    temp_files_to_concat.append(final_segment)
-                    print("Added final music segment")
-            
-            # Binary concatenate all files in the correct order
-            print(f"Final concatenation of {len(temp_files_to_concat)} segments...")
-            with open(output_path, 'wb') as outfile:
-                for i, temp_path in enumerate(temp_files_to_concat):
-                    print(f"Adding segment {i+1}: {os.path.basename(temp_path)}")
-                    with open(temp_path, 'rb') as infile:
-                        # Skip ID3 tags for files after the first one
-                        if i > 0:
-                            infile.seek(1024)
-                        outfile.write(infile.read())
-            
-            # Clean up all temp files
-            all_temp_files = music_segments + converted_speech
-            for temp_file in all_temp_files:
-                if temp_file and os.path.exists(temp_file):
-                    os.remove(temp_file)
-            
-            # Verify final duration
-            final_duration = self.get_audio_duration(output_path)
             print(f"✅ PyAV distributed splicing completed")
             print(f"   Original music: {music_duration:.1f}s")
             print(f"   Total speech: {total_speech_duration:.1f}s") 
-            print(f"   Final audio: {final_duration:.1f}s")
+            print(f"   Final audio: ~{music_duration + total_speech_duration:.1f}s")
             
         except Exception as e:
             print(f"❌ PyAV distributed splicing failed: {str(e)}")
@@ -531,359 +946,336 @@ class handler(BaseHTTPRequestHandler):
     
     def _apply_volume_gain(self, input_path, output_path, gain_db):
         """Apply volume gain in dB to audio file using PyAV (emulates Colab: audio + 3)"""
-        try:
-            import numpy as np
-            
+        if SPLICE_DEBUG:
             print(f"Applying {gain_db}dB volume gain to speech audio...")
-            
-            # Convert dB to linear gain factor
-            # Formula: linear_gain = 10^(dB/20)
-            # For 3dB: 10^(3/20) ≈ 1.412
-            gain_factor = 10 ** (gain_db / 20.0)
-            print(f"Gain factor: {gain_factor:.3f}x")
-            
-            input_container = av.open(input_path)
-            output_container = av.open(output_path, mode='w')
-            
-            # Get input audio stream
+        self._convert_to_standard_format(input_path, output_path, gain_db=gain_db)
+    
+    def _open_output(self, output_path, rate=OUTPUT_SAMPLE_RATE, layout='stereo', bit_rate=128000, options=None, vbr_quality=None):
+        """Open an MP3 output container; returns (container, stream)
+
+        vbr_quality (LAME -V 0-9) switches from constant bit_rate to VBR.
+        """
+        options = dict(options or {})
+        if vbr_quality is not None:
+            # FFmpeg's equivalent of -q:a; global_quality is scaled by FF_QP2LAMBDA
+            options.update(flags='+qscale', global_quality=str(vbr_quality * FF_QP2LAMBDA))
+        output_container = av.open(output_path, mode='w', format='mp3')
+        output_stream = output_container.add_stream('mp3', rate=rate, layout=layout, options=options)
+        output_stream.format = WORKING_AUDIO_FORMAT[0]
+        if vbr_quality is None:
+            output_stream.bit_rate = bit_rate
+        return output_container, output_stream
+    
+    def _decoded_frames(self, input_path, shared_resampler=None):
+        """Yield the audio of input_path as fltp stereo 44.1kHz frames, tolerating some corrupt packets
+
+        With a shared_resampler dict, consecutive inputs in the same format reuse
+        one resampler (a flushed one cannot be restarted) and the caller flushes
+        it at the end with _flush_resampler.
+        """
+        with av.open(input_path) as input_container:
             input_stream = input_container.streams.audio[0]
-            
-            # Create output stream with same settings
-            output_stream = output_container.add_stream('mp3', rate=44100)
-            output_stream.bit_rate = 128000
-            
-            # Create resampler if needed
-            resampler = None
-            if input_stream.sample_rate != 44100 or input_stream.layout.name != 'stereo':
-                resampler = av.audio.resampler.AudioResampler(
-                    format='s16',
-                    layout='stereo',
-                    rate=44100
-                )
-            
-            # Process frames and apply gain
-            frames_processed = 0
-            for frame in input_container.decode(input_stream):
-                # Resample if needed
-                if resampler:
-                    resampled_frames = resampler.resample(frame)
-                    frames_to_process = resampled_frames
+            key = (input_stream.format.name, input_stream.layout.name, input_stream.sample_rate)
+            if shared_resampler is not None and shared_resampler.get('key') == key:
+                resampler = shared_resampler['resampler']
+            else:
+                if shared_resampler is not None:
+                    yield from self._flush_resampler(shared_resampler)
+                if key == WORKING_AUDIO_FORMAT:
+                    # The decoder already produces what the encoder takes
+                    resampler = None
                 else:
-                    frames_to_process = [frame]
-                
-                for audio_frame in frames_to_process:
-                    # Convert frame to numpy array for gain processing
-                    audio_array = audio_frame.to_ndarray()
-                    
-                    # Apply gain (multiply by gain factor)
-                    gained_array = audio_array * gain_factor
-                    
-                    # Clip to prevent distortion (keep within int16 range)
-                    gained_array = np.clip(gained_array, -32768, 32767)
-                    
-                    # Convert back to audio frame
-                    gained_frame = av.AudioFrame.from_ndarray(
-                        gained_array.astype(np.int16),
-                        format='s16',
-                        layout='stereo'
-                    )
-                    gained_frame.sample_rate = 44100
-                    
-                    # Encode and write
-                    for packet in output_stream.encode(gained_frame):
-                        output_container.mux(packet)
-                    
-                    frames_processed += 1
-            
-            # Flush resampler if used
-            if resampler:
-                remaining_frames = resampler.resample(None)
-                for frame in remaining_frames:
-                    # Apply gain to remaining frames
-                    audio_array = frame.to_ndarray()
-                    gained_array = np.clip(audio_array * gain_factor, -32768, 32767)
-                    gained_frame = av.AudioFrame.from_ndarray(
-                        gained_array.astype(np.int16),
-                        format='s16',
-                        layout='stereo'
-                    )
-                    gained_frame.sample_rate = 44100
-                    
-                    for packet in output_stream.encode(gained_frame):
-                        output_container.mux(packet)
-            
-            # Flush encoder
-            for packet in output_stream.encode():
-                output_container.mux(packet)
-            
-            input_container.close()
-            output_container.close()
-            
-            print(f"✅ Volume gain applied: {frames_processed} frames processed with +{gain_db}dB")
-            
-        except Exception as e:
-            print(f"❌ Volume gain failed: {str(e)}")
-            # Fallback: copy original file without gain
-            print("Fallback: using original audio without gain adjustment")
-            import shutil
-            shutil.copy2(input_path, output_path)
-    
-    def _convert_to_standard_format(self, input_path, output_path):
-        """Convert audio file to standard MP3 format using PyAV with error recovery"""
-        try:
-            input_container = av.open(input_path)
-            output_container = av.open(output_path, mode='w')
-            
-            # Get input audio stream
-            input_stream = input_container.streams.audio[0]
-            
-            # Create output stream with standard settings
-            output_stream = output_container.add_stream('mp3', rate=44100)
-            output_stream.bit_rate = 128000  # 128kbps
-            
-            # Create resampler if needed (simplified approach)
-            resampler = None
-            if input_stream.sample_rate != 44100 or input_stream.layout.name != 'stereo':
-                resampler = av.audio.resampler.AudioResampler(
-                    format='s16',     # Target format
-                    layout='stereo',  # Target layout
-                    rate=44100        # Target sample rate
-                )
-                print(f"Created resampler: {input_stream.sample_rate}Hz {input_stream.layout.name} -> 44100Hz stereo")
-            
-            # Process frames with error tolerance
-            frames_processed = 0
+                    resampler = av.audio.resampler.AudioResampler(format=WORKING_AUDIO_FORMAT[0], layout=WORKING_AUDIO_FORMAT[1], rate=OUTPUT_SAMPLE_RATE)
+                if shared_resampler is not None and resampler is not None:
+                    shared_resampler.update(key=key, resampler=resampler)
             decode_errors = 0
-            max_decode_errors = 10  # Allow some decode errors before giving up
-            
-            for frame in input_container.decode(input_stream):
+            for packet in input_container.demux(input_stream):
                 try:
-                    # Resample if needed
-                    if resampler:
-                        resampled_frames = resampler.resample(frame)
-                        for resampled_frame in resampled_frames:
-                            # Encode and write
-                            for packet in output_stream.encode(resampled_frame):
-                                output_container.mux(packet)
-                    else:
-                        # No resampling needed
-                        for packet in output_stream.encode(frame):
-                            output_container.mux(packet)
-                    frames_processed += 1
-                except Exception as frame_error:
+                    frames = packet.decode()
+                except av.error.InvalidDataError:
                     decode_errors += 1
-                    if decode_errors > max_decode_errors:
-                        print(f"⚠️ Too many decode errors ({decode_errors}), stopping conversion")
+                    if decode_errors > MAX_DECODE_ERRORS:
+                        print(f"⚠️ Too many decode errors ({decode_errors}) in {os.path.basename(input_path)}, stopping")
                         break
-                    # Continue processing other frames
-            
-            # Flush resampler if used
-            if resampler:
-                try:
-                    remaining_frames = resampler.resample(None)  # Flush
-                    for frame in remaining_frames:
-                        for packet in output_stream.encode(frame):
-                            output_container.mux(packet)
-                except Exception as flush_error:
-                    print(f"⚠️ Resampler flush error (non-fatal): {str(flush_error)}")
+                    continue
+                if resampler is None:
+                    yield from frames
+                    continue
+                for frame in frames:
+                    yield from resampler.resample(frame)
+            if shared_resampler is None and resampler is not None:
+                yield from resampler.resample(None)
+            if decode_errors:
+                print(f"⚠️ Skipped {decode_errors} corrupt packets in {os.path.basename(input_path)}")
+    
+    def _flush_resampler(self, shared_resampler):
+        """Drain and forget the resampler held in a shared_resampler dict"""
+        resampler = shared_resampler.pop('resampler', None)
+        shared_resampler.pop('key', None)
+        return resampler.resample(None) if resampler else []
+    
+    def _encode_frames(self, frames, output_container, output_stream, gain_factor=None):
+        """Encode frames into output_stream (None flushes the encoder); returns the frame count"""
+        if frames is None:
+            for packet in output_stream.encode():
+                output_container.mux(packet)
+            return 0
+        
+        count = 0
+        for frame in frames:
+            if gain_factor:
+                frame = apply_gain(frame, gain_factor)
+            # Inputs each start at pts 0; let the encoder keep one continuous timeline
+            frame.pts = None
+            for packet in output_stream.encode(frame):
+                output_container.mux(packet)
+            count += 1
+        return count
+    
+    def _path_needs_transcode(self, input_path):
+        """_needs_transcode for the first audio stream of a file"""
+        with av.open(input_path) as input_container:
+            return self._needs_transcode(input_container.streams.audio[0])
+    
+    def _needs_transcode(self, input_stream):
+        """True unless the stream is already 44.1kHz stereo MP3 whose packets can be copied"""
+        return (input_stream.codec_context.name not in MP3_DECODERS
+                or input_stream.sample_rate != OUTPUT_SAMPLE_RATE
+                or input_stream.layout.name != 'stereo')
+    
+    def _mux_packet(self, packet, output_container, output_stream, position):
+        """Mux an MP3 packet at sample offset position; returns the offset after it"""
+        if packet.duration:
+            samples = round(packet.duration * packet.time_base * OUTPUT_SAMPLE_RATE)
+        else:
+            samples = MP3_FRAME_SAMPLES
+        packet.stream = output_stream
+        packet.time_base = SAMPLE_TIME_BASE
+        packet.pts = packet.dts = position
+        packet.duration = samples
+        output_container.mux(packet)
+        return position + samples
+    
+    def _mux_copied(self, input_path, output_container, output_stream, position):
+        """Copy every packet of a standard-format MP3 in at position; returns the new offset"""
+        with av.open(input_path) as input_container:
+            input_stream = input_container.streams.audio[0]
+            for packet in input_container.demux(input_stream):
+                if packet.dts is None:
+                    continue
+                position = self._mux_packet(packet, output_container, output_stream, position)
+        return position
+    
+    def _mux_encoded(self, input_path, output_container, output_stream, position, gain_factor=None):
+        """Encode input_path with a fresh encoder and mux it at position; returns the new offset"""
+        # A fresh encoder per leg means its first frame never points back into
+        # the bit reservoir of whatever was copied before it
+        encoder = av.CodecContext.create('libmp3lame', 'w')
+        encoder.sample_rate = OUTPUT_SAMPLE_RATE
+        encoder.layout = 'stereo'
+        encoder.format = WORKING_AUDIO_FORMAT[0]
+        encoder.bit_rate = 128000
+        encoder.options = dict(SPEECH_ENCODER_OPTIONS)
+        
+        for frame in self._decoded_frames(input_path):
+            if gain_factor:
+                frame = apply_gain(frame, gain_factor)
+            frame.pts = None
+            for packet in encoder.encode(frame):
+                position = self._mux_packet(packet, output_container, output_stream, position)
+        for packet in encoder.encode(None):
+            position = self._mux_packet(packet, output_container, output_stream, position)
+        return position
+    
+    def _splice_distributed_transcode(self, speech_chunks, music_path, output_path, insertion_points, speech_gain):
+        """Distributed splice that decodes the music once and encodes everything into one stream"""
+        # This is the final (and only) encode of the result, so use VBR
+        output_container, output_stream = self._open_output(output_path, vbr_quality=FINAL_VBR_QUALITY)
+        with output_container:
+            # Compare integer sample counts per frame instead of float seconds
+            insertion_samples = [int(point * OUTPUT_SAMPLE_RATE) for point in insertion_points]
+            next_chunk = 0
+            music_samples = 0
+            for frame in self._decoded_frames(music_path):
+                while next_chunk < len(speech_chunks) and insertion_samples[next_chunk] <= music_samples:
+                    if SPLICE_DEBUG:
+                        print(f"Adding speech chunk {next_chunk+1} at {music_samples / OUTPUT_SAMPLE_RATE:.1f}s")
+                    self._encode_frames(self._decoded_frames(speech_chunks[next_chunk]), output_container, output_stream, speech_gain)
+                    next_chunk += 1
+                self._encode_frames((frame,), output_container, output_stream)
+                music_samples += frame.samples
+            
+            # Insertion points past the actual end of the music
+            for i in range(next_chunk, len(speech_chunks)):
+                if SPLICE_DEBUG:
+                    print(f"Adding speech chunk {i+1} after the music")
+                self._encode_frames(self._decoded_frames(speech_chunks[i]), output_container, output_stream, speech_gain)
+            
+            self._encode_frames(None, output_container, output_stream)
+    
+    def _seams_rebuildable(self, music_path, insertion_points):
+        """True when the music frame after every insertion point can be rebuilt
+        self-contained, so the stream-copy splice will not have to give up
+        after the speech has been encoded (high-bitrate music rarely fits)"""
+        with av.open(music_path) as input_container:
+            input_stream = input_container.streams.audio[0]
+            insertion_pts = [int(point / input_stream.time_base) for point in insertion_points]
+            next_point = 0
+            reservoir = b''
+            seam = None  # (frame, reservoir before it) awaiting the next frame
+            for packet in input_container.demux(input_stream):
+                if packet.dts is None:
+                    continue
+                frame = bytes(packet)
+                side_info = mp3_side_info(frame)
+                if side_info is None:
+                    return False
+                if seam is not None:
+                    if self_contained_mp3_frame(seam[0], seam[1], side_info[1]) is None:
+                        return False
+                    seam = None
+                while next_point < len(insertion_pts) and packet.pts is not None and insertion_pts[next_point] <= packet.pts:
+                    next_point += 1
+                    seam = (frame, reservoir)
+                if seam is None and next_point == len(insertion_pts):
+                    return True
+                reservoir = (reservoir + frame[side_info[0]:])[-MAX_MAIN_DATA_BEGIN:]
+        return seam is None or self_contained_mp3_frame(seam[0], seam[1], 0) is not None
+    
+    def _splice_distributed_copy(self, speech_chunks, music_path, output_path, insertion_points, speech_gain_db, temp_dir):
+        """Distributed splice that copies the music packets and only encodes the speech"""
+        # Speech chunks are independent, so encode them on all cores up front;
+        # each is its own encode, so no frame depends on the music before it
+        gained_paths = [os.path.join(temp_dir, f"gained_speech_{i}.mp3") for i in range(len(speech_chunks))]
+        run_forked([
+            (self._convert_to_standard_format, (chunk_path, gained_path, speech_gain_db))
+            for chunk_path, gained_path in zip(speech_chunks, gained_paths)
+        ])
+        
+        def mux_speech(i, output_container, output_stream, position):
+            gained_path = gained_paths[i]
+            if os.path.exists(gained_path) and not self._path_needs_transcode(gained_path):
+                return self._mux_copied(gained_path, output_container, output_stream, position)
+            # Conversion fell back to the raw chunk; encode it inline instead
+            return self._mux_encoded(speech_chunks[i], output_container, output_stream, position, 10 ** (speech_gain_db / 20.0))
+        
+        with av.open(music_path) as input_container, av.open(output_path, 'w', format='mp3') as output_container:
+            input_stream = input_container.streams.audio[0]
+            output_stream = output_container.add_stream_from_template(input_stream)
+            # Insertion points as integer pts, so packets are compared without
+            # Fraction arithmetic per packet
+            time_base = input_stream.time_base
+            insertion_pts = [int(point / time_base) for point in insertion_points]
+            position = 0  # samples written to the output so far
+            next_chunk = 0
+            # A copied frame's main_data_begin points back into the main data of
+            # the frames before it, which after a splice is speech. The first
+            # music frame after each insertion is rebuilt self-contained once the
+            # next frame shows how many of its bytes that frame borrows.
+            reservoir = b''  # trailing main data of the music frames so far
+            seam = None  # (frame, reservoir before it) awaiting the next frame
+            
+            def mux_seam(next_main_data_begin, position):
+                frame = self_contained_mp3_frame(seam[0], seam[1], next_main_data_begin)
+                if frame is None:
+                    raise ValueError("Music frame after a splice cannot be rebuilt without re-encoding")
+                return self._mux_packet(av.Packet(frame), output_container, output_stream, position)
+            
+            for packet in input_container.demux(input_stream):
+                if packet.dts is None:
+                    continue
+                frame = bytes(packet)
+                side_info = mp3_side_info(frame)
+                if side_info is None:
+                    raise ValueError("Music is not MPEG-1 Layer III")
+                spliced = False
+                while next_chunk < len(speech_chunks) and packet.pts is not None and insertion_pts[next_chunk] <= packet.pts:
+                    if seam is not None:
+                        position = mux_seam(0, position)
+                        seam = None
+                    if SPLICE_DEBUG:
+                        print(f"Adding speech chunk {next_chunk+1} at {float(packet.pts * time_base):.1f}s")
+                    position = mux_speech(next_chunk, output_container, output_stream, position)
+                    next_chunk += 1
+                    spliced = True
+                if seam is not None:
+                    position = mux_seam(side_info[1], position)
+                    seam = None
+                if spliced:
+                    seam = (frame, reservoir)
+                else:
+                    position = self._mux_packet(packet, output_container, output_stream, position)
+                reservoir = (reservoir + frame[side_info[0]:])[-MAX_MAIN_DATA_BEGIN:]
+            if seam is not None:
+                position = mux_seam(0, position)
+            
+            # Insertion points past the actual end of the music
+            for i in range(next_chunk, len(speech_chunks)):
+                if SPLICE_DEBUG:
+                    print(f"Adding speech chunk {i+1} after the music")
+                position = mux_speech(i, output_container, output_stream, position)
+    
+    def _convert_to_standard_format(self, input_path, output_path, gain_db=None):
+        """Convert audio file to standard MP3 format using PyAV with error recovery,
+        optionally applying a volume gain in dB during the same pass"""
+        try:
+            # Convert dB to linear gain factor: linear_gain = 10^(dB/20)
+            gain_factor = 10 ** (gain_db / 20.0) if gain_db else None
             
-            # Flush encoder
-            try:
-                for packet in output_stream.encode():
-                    output_container.mux(packet)
-            except Exception as encode_error:
-                print(f"⚠️ Encoder flush error (non-fatal): {str(encode_error)}")
+            # Already-standard MP3 with no gain to apply only needs a remux
+            if not gain_factor:
+                if not self._path_needs_transcode(input_path):
+                    self._concat_copy([input_path], output_path)
+                    return
             
-            input_container.close()
-            output_container.close()
+            # Speech-only leg, so use the faster encoder settings
+            output_container, output_stream = self._open_output(output_path, options=SPEECH_ENCODER_OPTIONS)
+            with output_container:
+                frames_processed = self._encode_frames(self._decoded_frames(input_path), output_container, output_stream, gain_factor)
+                self._encode_frames(None, output_container, output_stream)
             
             if frames_processed == 0:
                 raise Exception("No frames were successfully processed")
             
-            if decode_errors > 0:
-                print(f"⚠️ Conversion completed with {decode_errors} decode errors, {frames_processed} frames processed")
-            
         except Exception as e:
             print(f"❌ Failed to convert {input_path}: {str(e)}")
             # If conversion fails completely, try to just copy the file
             print(f"🔄 Attempting to use original file without conversion...")
             try:
-                import shutil
-                shutil.copy2(input_path, output_path)
+                with open(output_path, 'wb') as outfile:
+                    append_file(outfile, input_path)
                 print(f"✓ Using original file as-is")
             except Exception as copy_error:
                 print(f"❌ Copy also failed: {str(copy_error)}")
                 raise Exception(f"Audio conversion failed and fallback copy failed: {str(e)}")
     
-    def _split_music_for_insertion(self, music_path, insertion_points, temp_dir):
-        """Split music into segments at insertion points WITHOUT skipping any content"""
-        try:
-            print(f"Splitting music at {len(insertion_points)} insertion points (preserving all content)...")
-            
-            music_segments = []
-            current_start = 0.0
-            music_duration = self.get_audio_duration(music_path)
-            
-            # Create segments between insertion points
-            for i, insertion_point in enumerate(insertion_points):
-                # Create segment from current_start to insertion_point
-                if insertion_point > current_start:
-                    segment_path = os.path.join(temp_dir, f"music_segment_{i}.mp3")
-                    try:
-                        self._extract_music_segment(music_path, segment_path, current_start, insertion_point)
-                        # Verify segment was created
-                        if os.path.exists(segment_path) and os.path.getsize(segment_path) > 0:
-                            music_segments.append(segment_path)
-                            print(f"✓ Music segment {i+1}: {current_start:.1f}s to {insertion_point:.1f}s ({insertion_point - current_start:.1f}s)")
-                        else:
-                            print(f"⚠️ Music segment {i+1} was not created properly, skipping")
-                            music_segments.append(None)
-                    except Exception as seg_error:
-                        print(f"⚠️ Failed to create music segment {i+1}: {str(seg_error)}")
-                        music_segments.append(None)
-                else:
-                    music_segments.append(None)  # No segment needed
-                
-                # Move to the insertion point (NO skipping - speech will be inserted here)
-                current_start = insertion_point
-            
-            # Add final music segment from last insertion point to end
-            if current_start < music_duration:
-                final_segment_path = os.path.join(temp_dir, "music_segment_final.mp3")
-                try:
-                    self._extract_music_segment(music_path, final_segment_path, current_start, music_duration)
-                    if os.path.exists(final_segment_path) and os.path.getsize(final_segment_path) > 0:
-                        music_segments.append(final_segment_path)
-                        print(f"✓ Final music segment: {current_start:.1f}s to {music_duration:.1f}s ({music_duration - current_start:.1f}s)")
-                    else:
-                        print(f"⚠️ Final music segment was not created properly")
-                except Exception as final_error:
-                    print(f"⚠️ Failed to create final music segment: {str(final_error)}")
-            
-            # Verify we're preserving all music content
-            total_music_segments_duration = 0
-            valid_segments = 0
-            for i, segment in enumerate(music_segments):
-                if segment and os.path.exists(segment):
-                    segment_duration = self.get_audio_duration(segment)
-                    total_music_segments_duration += segment_duration
-                    valid_segments += 1
-                    print(f"Segment {i+1} duration: {segment_duration:.1f}s")
-            
-            print(f"Original music duration: {music_duration:.1f}s")
-            print(f"Total segments duration: {total_music_segments_duration:.1f}s")
-            print(f"Valid segments: {valid_segments}/{len(music_segments)}")
-            
-            # If no valid music segments were created, raise an error to trigger fallback
-            if valid_segments == 0:
-                raise Exception("No valid music segments were created - all segment extractions failed")
-            
-            return music_segments
-            
-        except Exception as e:
-            print(f"❌ Failed to split music: {str(e)}")
-            raise
-    
-    def _extract_music_segment(self, input_path, output_path, start_time, end_time):
-        """Extract a segment of music from start_time to end_time using PyAV"""
-        try:
-            duration = end_time - start_time
-            if duration <= 0:
-                print(f"Skipping segment with duration {duration:.1f}s")
-                return
-            
-            print(f"Extracting music segment: {start_time:.1f}s to {end_time:.1f}s ({duration:.1f}s)")
-            
-            input_container = av.open(input_path)
-            output_container = av.open(output_path, mode='w')
-            
-            # Get input stream
-            input_stream = input_container.streams.audio[0]
-            
-            # Create output stream
-            output_stream = output_container.add_stream('mp3', rate=44100)
-            output_stream.bit_rate = 128000
-            
-            # Seek to start time
-            start_pts = int(start_time * input_stream.time_base.denominator / input_stream.time_base.numerator)
-            input_container.seek(start_pts, stream=input_stream)
-            
-            # Create resampler if needed
-            resampler = None
-            if input_stream.sample_rate != 44100 or input_stream.layout.name != 'stereo':
-                resampler = av.audio.resampler.AudioResampler(
-                    format='s16',
-                    layout='stereo',
-                    rate=44100
-                )
-            
-            # Process frames within the time range
-            frames_written = 0
-            for frame in input_container.decode(input_stream):
-                # Check if we're past the end time
-                frame_time = float(frame.pts * input_stream.time_base)
-                if frame_time >= end_time:
-                    break
-                
-                # Skip frames before start time
-                if frame_time < start_time:
-                    continue
-                
-                # Process frame
-                if resampler:
-                    resampled_frames = resampler.resample(frame)
-                    for resampled_frame in resampled_frames:
-                        for packet in output_stream.encode(resampled_frame):
-                            output_container.mux(packet)
-                        frames_written += 1
-                else:
-                    for packet in output_stream.encode(frame):
-                        output_container.mux(packet)
-                    frames_written += 1
-            
-            # Flush resampler and encoder
-            if resampler:
-                remaining_frames = resampler.resample(None)
-                for frame in remaining_frames:
-                    for packet in output_stream.encode(frame):
-                        output_container.mux(packet)
-            
-            for packet in output_stream.encode():
-                output_container.mux(packet)
-            
-            input_container.close()
-            output_container.close()
-            
-            print(f"✅ Extracted music segment: {frames_written} frames written")
-            
-        except Exception as e:
-            print(f"❌ Failed to extract music segment: {str(e)}")
-            # Fallback: copy the entire music file as segment (better than nothing)
-            try:
-                print("Fallback: copying entire music file as segment")
-                import shutil
-                shutil.copy2(input_path, output_path)
-                print(f"✓ Copied entire music file as fallback segment")
-            except Exception as fallback_error:
-                print(f"❌ Fallback copy also failed: {str(fallback_error)}")
-                raise Exception(f"Music segment extraction failed: {str(e)}")
-    
-
     def splice_simple_concat(self, speech_path, music_path, output_path):
-        """Simple concatenation: speech + music (binary method as fallback)"""
+        """Simple concatenation: speech + music (packet remux, binary method as fallback)"""
+        if PYAV_AVAILABLE:
+            try:
+                speech_format = self._probe_audio_format(speech_path)
+                music_format = self._probe_audio_format(music_path)
+                if speech_format == music_format and speech_format[0] == 'mp3':
+                    print("Splicing: Simple concatenation (concat demuxer, stream copy)")
+                    self._concat_copy([speech_path, music_path], output_path)
+                    print("✅ Simple concatenation completed (no re-encode)")
+                    return
+                print(f"Format mismatch {speech_format} vs {music_format}, cannot remux")
+            except Exception as e:
+                print(f"⚠️ Stream-copy concatenation failed: {str(e)}")
+        
         try:
             print("Splicing: Simple binary concatenation (speech + music)")
             
-            # Simple binary concatenation as fallback
+            # Simple binary concatenation as fallback; bytes move file to file
+            # in the kernel instead of through Python buffers
             with open(output_path, 'wb') as outfile:
-                # Add speech first
-                with open(speech_path, 'rb') as speech_file:
-                    outfile.write(speech_file.read())
+                # Add speech first, dropping a trailing ID3v1 tag that would
+                # otherwise sit in the middle of the stream
+                append_file(outfile, speech_path, trim_end=id3_tag_sizes(speech_path)[1])
                 
-                # Add music second (skip potential ID3 header)
-                with open(music_path, 'rb') as music_file:
-                    music_file.seek(1024)  # Skip potential ID3 tags
-                    outfile.write(music_file.read())
+                # Add music second, skipping exactly its ID3v2 tag (if any)
+                append_file(outfile, music_path, id3_tag_sizes(music_path)[0])
             
             print("✅ Simple concatenation completed")
             
@@ -891,9 +1283,36 @@ class handler(BaseHTTPRequestHandler):
             print(f"❌ Simple concatenation failed: {str(e)}")
             raise
 
+    def _probe_audio_format(self, audio_path):
+        """Return (container format, sample_rate, channels) of the first audio stream"""
+        with av.open(audio_path) as container:
+            stream = container.streams.audio[0]
+            return container.format.name, stream.codec_context.sample_rate, stream.codec_context.channels
+
+    def _concat_copy(self, input_paths, output_path):
+        """Concatenate same-format MP3 files by packet copy through the concat demuxer"""
+        list_path = output_path + '.concat.txt'
+        with open(list_path, 'w') as list_file:
+            for path in input_paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                list_file.write(f"file '{escaped}'\n")
+
+        try:
+            with av.open(list_path, format='concat', options={'safe': '0'}) as input_container:
+                input_stream = input_container.streams.audio[0]
+                with av.open(output_path, 'w', format='mp3') as output_container:
+                    output_stream = output_container.add_stream_from_template(input_stream)
+                    for packet in input_container.demux(input_stream):
+                        if packet.dts is None:
+                            continue
+                        packet.stream = output_stream
+                        output_container.mux(packet)
+        finally:
+            os.remove(list_path)
+
     def splice_intro(self, speech_path, music_path, output_path):
-        """Splice speech at the beginning, then music (simple binary method)"""
-        # Use the simple concatenation method
+        """Splice speech at the beginning, then music"""
+        print("Splicing: Intro mode")
         self.splice_simple_concat(speech_path, music_path, output_path)
     
     def splice_random(self, speech_path, music_path, output_path, music_duration, speech_duration):
@@ -907,36 +1326,60 @@ class handler(BaseHTTPRequestHandler):
         self.splice_simple_concat(speech_path, music_path, output_path)
     
     def limit_duration(self, input_path, output_path, max_duration):
-        """Duration limiting - simplified (just copy file for now)"""
+        """Trim audio to max_duration seconds by packet copy (no decode or re-encode)"""
+        if PYAV_AVAILABLE:
+            try:
+                print(f"Limiting duration to {max_duration}s (stream copy)")
+                max_duration = float(max_duration)
+                with av.open(input_path) as input_container:
+                    input_stream = input_container.streams.audio[0]
+                    if input_container.format.name != 'mp3':
+                        raise ValueError(f"cannot remux {input_container.format.name} into mp3")
+                    limit_pts = int(max_duration / input_stream.time_base)
+                    with av.open(output_path, 'w', format='mp3') as output_container:
+                        output_stream = output_container.add_stream_from_template(input_stream)
+                        for packet in input_container.demux(input_stream):
+                            if packet.dts is None:
+                                continue
+                            if packet.pts is not None and packet.pts >= limit_pts:
+                                break
+                            packet.stream = output_stream
+                            output_container.mux(packet)
+                print("✅ Duration limited (no re-encode)")
+                return
+            except Exception as e:
+                print(f"⚠️ Stream-copy duration limit failed: {str(e)}, copying file as-is")
+        
         try:
-            print(f"Duration limiting requested ({max_duration}s) - copying file as-is")
-            
-            # For now, just copy the file since we can't easily trim without complex audio processing
-            with open(input_path, 'rb') as src:
-                with open(output_path, 'wb') as dst:
-                    dst.write(src.read())
-            
+            with open(output_path, 'wb') as dst:
+                append_file(dst, input_path)
             print(f"✅ File copied (duration limiting skipped)")
             
         except Exception as e:
             print(f"❌ File copy failed: {str(e)}")
             raise
     
-    def _download_from_blob_url(self, blob_url: str) -> bytes:
-        """Download audio content from blob URL"""
+    def _download_from_blob_url(self, blob_url: str, output_path: str) -> str:
+        """Download audio content from blob URL to output_path and return the path"""
         try:
             print(f"Downloading audio from blob URL: {blob_url}")
-            response = requests.get(blob_url, timeout=120)
-            response.raise_for_status()
-            
-            audio_size_mb = len(response.content) / (1024 * 1024)
+            # Stream chunks straight to disk so at most one chunk is held in memory
+            audio_size = 0
+            with _SESSION.get(blob_url, timeout=120, stream=True) as response:
+                response.raise_for_status()
+                with open(output_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        audio_size += len(chunk)
+            
+            audio_size_mb = audio_size / (1024 * 1024)
             print(f"Downloaded audio: {audio_size_mb:.2f}MB")
             
-            return response.content
+            return output_path
         except Exception as e:
             raise Exception(f"Failed to download from blob URL: {str(e)}")
     
-    def _upload_to_blob_storage(self, audio_content: bytes, session_id: str) -> str:
+    def _upload_to_blob_storage(self, audio_content: bytes, session_id: str, content_hash: str = None) -> str:
         """Upload final audio content to Vercel Blob storage with session-based folder structure"""
         
         if not BLOB_AVAILABLE:
@@ -950,7 +1393,8 @@ class handler(BaseHTTPRequestHandler):
                 raise Exception("BLOB_READ_WRITE_TOKEN environment variable is required")
             
             # Create a unique filename with session-based folder structure
-            content_hash = hashlib.sha256(audio_content).hexdigest()[:12]
+            if content_hash is None:
+                content_hash = hashlib.sha256(audio_content).hexdigest()[:12]
             timestamp = int(time.time())
             filename = f"final-audio/{session_id}/final-{timestamp}-{content_hash}.mp3"
             
@@ -993,7 +1437,7 @@ class handler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(json_dumps_bytes(data))
     
     def send_error_response(self, status_code: int, message: str):
         response = {
@@ -169,14 +169,14 @@ export const AudioProcessor: React.FC<AudioProcessorProps> = ({
       setCurrentStep(ProcessingStep.SPLICING_AUDIO);
       updateProgress(ProcessingStep.SPLICING_AUDIO, 0);
       
-      // Ensure we have audio data from the extract audio step
-      if (!audioResponse.audioData) {
-        throw new Error('No audio data received from YouTube extraction');
-      }
-
       // Use blob URLs if available to avoid large request payloads
       const originalAudioInput = audioResponse.audioUrl || audioResponse.audioData;
       
+      // Ensure we have audio from the upload / extract audio step
+      if (!originalAudioInput) {
+        throw new Error('No audio data received from upload or YouTube extraction');
+      }
+      
       // Separate blob URLs from base64 data
       const speechUrls: string[] = [];
       const speechBase64: string[] = [];
@@ -88,9 +88,17 @@ export interface GenerateTextRequest {
   userData: UserFormData;
 }
 
+export interface TextChunkMeta {
+  idx: number;
+  text: string;
+  wordCount: number;
+  offset: number; // Character index in motivationalText, -1 if not verbatim
+}
+
 export interface GenerateTextResponse {
   motivationalText: string;
   chunks: string[];
+  chunkMeta?: TextChunkMeta[];
   success: boolean;
   error?: string;
 }
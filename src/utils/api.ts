@@ -2,7 +2,7 @@
  * API utility functions for communicating with Python serverless functions
  */
 
-import { UserFormData } from "@/types";
+import { TextChunkMeta, UserFormData } from "@/types";
 
 // API URL configuration - same domain for Vercel functions
 const API_BASE_URL =
@@ -77,39 +77,9 @@ export async function uploadAudio(audioFile: File, sessionId?: string): Promise<
     
     console.log(`✅ Upload successful: ${blob.url}`);
     
-    // Fetch the uploaded file to convert to base64 for processing
-    console.log(`Fetching uploaded audio from blob URL: ${blob.url}`);
-    const audioResponse = await fetch(blob.url);
-    if (!audioResponse.ok) {
-      throw new Error(`Failed to fetch uploaded audio from blob storage: ${audioResponse.statusText}`);
-    }
-    
-    const audioBuffer = await audioResponse.arrayBuffer();
-    console.log(`Uploaded audio ArrayBuffer size: ${audioBuffer.byteLength} bytes`);
-    
-    // Convert ArrayBuffer to base64 efficiently
-    const audioBase64 = await new Promise<string>((resolve, reject) => {
-      const audioBlob = new Blob([audioBuffer], { type: 'audio/mpeg' });
-      const reader = new FileReader();
-      reader.onload = () => {
-        const readerResult = reader.result as string;
-        if (!readerResult || typeof readerResult !== 'string') {
-          reject(new Error('FileReader returned invalid result'));
-          return;
-        }
-        const base64 = readerResult.split(',')[1];
-        if (!base64) {
-          reject(new Error('Failed to extract base64 from data URL'));
-          return;
-        }
-        resolve(base64);
-      };
-      reader.onerror = () => reject(reader.error || new Error('FileReader error'));
-      reader.readAsDataURL(audioBlob);
-    });
-    
+    // The splice function downloads the blob itself, so there is no need to
+    // pull the file back into the browser and base64-encode it
     return {
-      audioData: audioBase64,
       audioUrl: blob.url,
       duration: 0, // Duration will be calculated during processing
       title: audioFile.name,
@@ -217,6 +187,7 @@ export async function generateText(
 ): Promise<{
   motivationalText: string;
   chunks: string[];
+  chunkMeta?: TextChunkMeta[];
   success: boolean;
   error?: string;
 }> {